@@ -0,0 +1,242 @@
+import math
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest priority first
+PRIORITY_CLASSES = ("interactive", "batch", "background")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted in time."""
+
+    def __init__(self, status_code, message, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+
+class PriorityClass:
+    """Limits and counters of one priority class."""
+
+    def __init__(self, name, rank, max_queue, default_deadline, max_active, service_time):
+        self.name = name
+        self.rank = rank
+        self.max_queue = max_queue
+        self.default_deadline = default_deadline
+        self.max_active = max_active
+        # Exponentially weighted average service time of this class, in seconds
+        self.service_time = service_time
+        self.queue = deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_deadline = 0
+        self.timed_out = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=1000)
+
+
+class _Waiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Admission control in front of the LLM pipeline.
+
+    A fixed number of slots is shared by all requests. Waiting requests are
+    queued per priority class, and a freed slot always goes to the oldest
+    waiter of the highest-priority class that may still run. Batch and
+    background requests together may occupy at most capacity minus the
+    interactive reserve, so those reserved slots are only ever used by
+    interactive traffic. A request is rejected immediately when its class
+    queue is full (429), or when the estimated queue wait already exceeds its
+    deadline (503). It is also rejected if it is still queued when its deadline
+    passes. This keeps interactive latency flat under bulk load.
+
+    The controller is per process and blocks the calling thread while a
+    request is queued, so the server needs a thread (or greenlet) for every
+    running and queued request.
+    """
+
+    def __init__(self, capacity=8, queue_limits=None, deadlines=None, batch_share=0.75,
+                 background_share=0.25, interactive_reserve=0.25, initial_service_time=5.0):
+        """
+        Args:
+            capacity: Number of requests allowed to run concurrently
+            queue_limits: Max queued requests per class name
+            deadlines: Default deadline in seconds per class name
+            batch_share: Fraction of capacity batch requests may occupy
+            background_share: Fraction of capacity background requests may occupy
+            interactive_reserve: Fraction of capacity (at least one slot, if capacity
+                allows) that batch and background requests combined may not occupy
+            initial_service_time: Service time estimate (seconds) before any request completed
+        """
+        queue_limits = dict({"interactive": 64, "batch": 256, "background": 1024}, **(queue_limits or {}))
+        deadlines = dict({"interactive": 30.0, "batch": 300.0, "background": 3600.0}, **(deadlines or {}))
+        max_active = {
+            "interactive": capacity,
+            "batch": max(1, int(capacity * batch_share)),
+            "background": max(1, int(capacity * background_share))
+        }
+
+        self.capacity = capacity
+        reserved = min(capacity - 1, max(1, int(capacity * interactive_reserve)))
+        self.non_interactive_limit = max(1, capacity - reserved)
+        self.classes = {
+            name: PriorityClass(name, rank, queue_limits[name], deadlines[name],
+                                max_active[name], initial_service_time)
+            for rank, name in enumerate(PRIORITY_CLASSES)
+        }
+        self._active = 0
+        self._non_interactive_active = 0
+        self._lock = threading.Lock()
+
+    def _can_run(self, priority_class):
+        if self._active >= self.capacity or priority_class.active >= priority_class.max_active:
+            return False
+        return priority_class.name == "interactive" or self._non_interactive_active < self.non_interactive_limit
+
+    def _start(self, priority_class):
+        self._active += 1
+        priority_class.active += 1
+        if priority_class.name != "interactive":
+            self._non_interactive_active += 1
+
+    def _estimate_wait(self, priority_class):
+        """
+        Expected queue wait for a new request of the given class.
+
+        The request starts after one slot is freed for it and for every
+        request queued ahead of it. Slots are freed at a rate derived from the
+        running requests and the average service time of their own class, so a
+        few long batch requests do not inflate the estimate for short
+        interactive ones.
+        """
+        ahead = sum(len(other.queue) for other in self.classes.values() if other.rank <= priority_class.rank)
+        release_rate = sum(other.active / other.service_time for other in self.classes.values()
+                           if other.active and other.service_time > 0)
+        if release_rate <= 0:
+            slots = min(self.capacity, priority_class.max_active)
+            return math.ceil((ahead + 1) / slots) * priority_class.service_time
+        return (ahead + 1) / release_rate
+
+    def _record_wait(self, priority_class, wait):
+        priority_class.admitted += 1
+        priority_class.total_wait += wait
+        priority_class.max_wait = max(priority_class.max_wait, wait)
+        priority_class.recent_waits.append(wait)
+
+    def acquire(self, priority='interactive', deadline=None):
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Priority class name
+            deadline: Seconds the caller is willing to wait in total, defaults to the class deadline
+
+        Returns:
+            Ticket to pass to release()
+
+        Raises:
+            AdmissionRejected: If the request is shed
+        """
+        priority_class = self.classes[priority]
+        deadline = priority_class.default_deadline if deadline is None else deadline
+        arrived = time.monotonic()
+
+        with self._lock:
+            higher_waiting = any(other.queue for other in self.classes.values() if other.rank <= priority_class.rank)
+            if not higher_waiting and self._can_run(priority_class):
+                self._start(priority_class)
+                self._record_wait(priority_class, 0.0)
+                return priority_class.name, arrived
+
+            if len(priority_class.queue) >= priority_class.max_queue:
+                priority_class.rejected_queue_full += 1
+                raise AdmissionRejected(429, f"Too many queued {priority} requests", retry_after=priority_class.service_time)
+
+            estimated_wait = self._estimate_wait(priority_class)
+            if estimated_wait > deadline:
+                priority_class.rejected_deadline += 1
+                raise AdmissionRejected(503, f"Server overloaded, estimated wait {estimated_wait:.1f}s "
+                                             f"exceeds the {deadline:.1f}s deadline", retry_after=estimated_wait)
+
+            waiter = _Waiter()
+            priority_class.queue.append(waiter)
+            priority_class.max_queue_depth = max(priority_class.max_queue_depth, len(priority_class.queue))
+
+        waiter.event.wait(timeout=max(0.0, deadline - (time.monotonic() - arrived)))
+
+        with self._lock:
+            if not waiter.granted:
+                priority_class.queue.remove(waiter)
+                priority_class.timed_out += 1
+                raise AdmissionRejected(503, f"Deadline of {deadline:.1f}s exceeded while queued",
+                                        retry_after=priority_class.service_time)
+            self._record_wait(priority_class, time.monotonic() - arrived)
+        return priority_class.name, time.monotonic()
+
+    def release(self, ticket):
+        """Free the slot of a finished request and hand it to the next eligible waiter."""
+        name, started = ticket
+        service_time = time.monotonic() - started
+        with self._lock:
+            priority_class = self.classes[name]
+            priority_class.active -= 1
+            self._active -= 1
+            if name != "interactive":
+                self._non_interactive_active -= 1
+            # Exponentially weighted average per class, used for wait estimates
+            priority_class.service_time = 0.9 * priority_class.service_time + 0.1 * service_time
+
+            for candidate in sorted(self.classes.values(), key=lambda other: other.rank):
+                while candidate.queue and self._can_run(candidate):
+                    waiter = candidate.queue.popleft()
+                    waiter.granted = True
+                    self._start(candidate)
+                    waiter.event.set()
+                if candidate.queue:
+                    # Keep strict priority: lower classes wait while a higher class is queued
+                    break
+
+    def stats(self):
+        """Per-class queue depth, wait-time and rejection metrics."""
+        with self._lock:
+            result = {
+                "capacity": self.capacity,
+                "active": self._active,
+                "non_interactive_active": self._non_interactive_active,
+                "non_interactive_limit": self.non_interactive_limit,
+                "classes": {}
+            }
+            for name, priority_class in self.classes.items():
+                waits = sorted(priority_class.recent_waits)
+                result["classes"][name] = {
+                    "active": priority_class.active,
+                    "max_active": priority_class.max_active,
+                    "estimated_service_time": round(priority_class.service_time, 3),
+                    "queue_depth": len(priority_class.queue),
+                    "max_queue_depth": priority_class.max_queue_depth,
+                    "queue_limit": priority_class.max_queue,
+                    "admitted": priority_class.admitted,
+                    "rejected_queue_full": priority_class.rejected_queue_full,
+                    "rejected_deadline": priority_class.rejected_deadline,
+                    "timed_out": priority_class.timed_out,
+                    "mean_wait": round(priority_class.total_wait / priority_class.admitted, 4)
+                    if priority_class.admitted else 0.0,
+                    "p95_wait": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+                    "max_wait": round(priority_class.max_wait, 4)
+                }
+            return result
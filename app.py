@@ -1,13 +1,20 @@
 import os
+import copy
 import json
+import atexit
+import hashlib
 import logging
-from flask import Flask, request, jsonify
+import functools
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
 from resume_parser import ResumeParser
 from job_matcher import JobMatcher
 from role_evaluator import RoleEvaluator
-from response_formatter import ResponseFormatter
+from response_formatter import ResponseFormatter, project
+from resume_index import NearDuplicateIndex
+from rescoring import JobRescorer, RescoreJobs, RescoreQueueFull
+from admission import AdmissionController, AdmissionRejected, PRIORITY_CLASSES
 
 # Configure logging
 logging.basicConfig(
@@ -29,12 +36,149 @@ job_matcher = JobMatcher()
 role_evaluator = RoleEvaluator()
 response_formatter = ResponseFormatter()
 
+# Admission control shared by all pipeline endpoints of this worker process
+admission_controller = AdmissionController(capacity=int(os.environ.get('ADMISSION_CAPACITY', 8)))
+
+# Re-scoring jobs run in the background, each candidate under admission control
+job_rescorer = JobRescorer(job_matcher, role_evaluator, workers=int(os.environ.get('RESCORE_WORKERS', 16)),
+                           admission=admission_controller)
+rescore_jobs = RescoreJobs(job_rescorer, directory=os.environ.get('RESCORE_JOB_DIR'),
+                           max_running=int(os.environ.get('RESCORE_MAX_JOBS', 2)),
+                           max_pending=int(os.environ.get('RESCORE_MAX_PENDING', 8)))
+
+# Optional near-duplicate resume index, enabled by setting a similarity threshold
+RESUME_DEDUP_THRESHOLD = float(os.environ.get('RESUME_DEDUP_THRESHOLD', 0))
+RESUME_INDEX_PATH = os.environ.get('RESUME_INDEX_PATH')
+resume_index = None
+if RESUME_DEDUP_THRESHOLD > 0:
+    resume_index = NearDuplicateIndex(threshold=RESUME_DEDUP_THRESHOLD, snapshot_path=RESUME_INDEX_PATH)
+    if RESUME_INDEX_PATH:
+        # Journal writes are asynchronous; write out the queued ones on shutdown
+        atexit.register(resume_index.flush)
+
+def admission_controlled(default_priority):
+    """
+    Run an endpoint under admission control.
+
+    Clients choose a priority class with the X-Priority header (interactive,
+    batch or background) and may set X-Request-Deadline-Ms. Requests that
+    cannot start before their deadline are rejected with 429/503 instead of
+    queueing behind bulk traffic.
+
+    A queued request holds its worker thread while it waits, so queueing only
+    happens when the worker has more threads than ADMISSION_CAPACITY.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            priority = request.headers.get('X-Priority', default_priority).lower()
+            if priority not in PRIORITY_CLASSES:
+                return jsonify({"error": f"Invalid X-Priority, expected one of {', '.join(PRIORITY_CLASSES)}"}), 400
+            deadline = request.headers.get('X-Request-Deadline-Ms')
+            try:
+                deadline = float(deadline) / 1000.0 if deadline else None
+            except ValueError:
+                return jsonify({"error": "Invalid X-Request-Deadline-Ms"}), 400
+
+            try:
+                ticket = admission_controller.acquire(priority, deadline)
+            except AdmissionRejected as e:
+                logger.warning(f"Rejected {priority} request to {request.path}: {e.message}")
+                response = jsonify({"error": e.message})
+                if e.retry_after is not None:
+                    response.headers['Retry-After'] = str(max(1, int(round(e.retry_after))))
+                return response, e.status_code
+
+            try:
+                return view(*args, **kwargs)
+            finally:
+                admission_controller.release(ticket)
+        return wrapper
+    return decorator
+
+def requested_fields(data):
+    """
+    Fields requested by the client, from the "fields" query parameter or JSON field.
+
+    Returns:
+        List of dotted field paths, or None to return the full result
+    """
+    fields = request.args.get('fields') or (data or {}).get('fields')
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    return [field.strip() for field in fields if isinstance(field, str) and field.strip()] or None
+
+def json_response(payload, endpoint, status=200):
+    """Serialize a response with the fast encoder, gzip-compressing it if the client accepts it."""
+    body, headers = response_formatter.encode(payload, endpoint, request.headers.get('Accept-Encoding'))
+    return Response(body, status=status, headers=headers)
+
+def job_fingerprint(job_description):
+    """Stable key identifying a job description, used to cache match results."""
+    return hashlib.sha1(json.dumps(job_description, sort_keys=True).encode('utf-8')).hexdigest()
+
+def parse_resume_with_dedup(resume_content, resume_type, mode='full'):
+    """
+    Parse a resume, reusing the parsed result of a near-duplicate upload if one is indexed.
+
+    Returns:
+        Tuple of (parsed resume, index entry id or None)
+    """
+    if resume_index is None or mode == 'fast':
+        return resume_parser.parse(resume_content, resume_type, mode=mode), None
+
+    try:
+        resume_text = resume_parser.get_resume_text(resume_content, resume_type)
+    except Exception as e:
+        logger.error(f"Error extracting resume text: {e}")
+        return resume_parser.empty_result(), None
+
+    signature = resume_index.signature(resume_text)
+    duplicate = resume_index.lookup(signature=signature)
+    if duplicate:
+        logger.info(f"Reusing parsed resume of near-duplicate entry {duplicate.entry_id} "
+                    f"(similarity {duplicate.similarity:.2f})")
+        return copy.deepcopy(duplicate.payload["parsed_resume"]), duplicate.entry_id
+
+    parsed_resume = resume_parser.parse_text(resume_text)
+    if parsed_resume == resume_parser.empty_result() or parsed_resume.get("repaired"):
+        # Never cache the parsing fallback or a parse repaired from a truncated response
+        return parsed_resume, None
+
+    entry_id = resume_index.add(signature=signature, payload={"parsed_resume": parsed_resume, "matches": {}})
+    return parsed_resume, entry_id
+
+def is_cacheable_match(adapted_result):
+    """
+    A match result is only cached if both matching and role adaptation succeeded
+    on a complete model response.
+    """
+    if "role_type" not in adapted_result or adapted_result.get("repaired"):
+        return False
+    return all(
+        not isinstance(criterion, dict) or criterion.get("analysis") != "Error in processing"
+        for criterion in adapted_result.get("details", {}).values()
+    )
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint to verify the service is running."""
     return jsonify({"status": "healthy", "service": "ai-resume-matcher", "version": "1.0.0"}), 200
 
+@app.route('/api/v1/admission/stats', methods=['GET'])
+def admission_stats():
+    """Per-class queue depth, wait-time and load-shedding metrics of this worker process."""
+    return jsonify(admission_controller.stats()), 200
+
+@app.route('/api/v1/response/stats', methods=['GET'])
+def response_stats():
+    """Per-endpoint serialization time and payload size metrics of this worker process."""
+    return jsonify(response_formatter.stats()), 200
+
 @app.route('/api/v1/match', methods=['POST'])
+@admission_controlled('interactive')
 def match_resume():
     """
     Process a resume and job description, then return a match score and parsed data.
@@ -46,7 +190,8 @@ def match_resume():
         "resume_type": "pdf/docx/txt", 
         "job_description": { ... },  // Full job description object
         "job_id": "J12345678",       // Optional job ID
-        "company_info": { ... }      // Optional company info
+        "company_info": { ... },     // Optional company info
+        "fields": ["score", ...]     // Optional projection of match_result (or ?fields=a,b.c)
     }
     """
     try:
@@ -71,30 +216,46 @@ def match_resume():
         
         # Process resume
         logger.info(f"Processing resume of type {resume_type}")
-        parsed_resume = resume_parser.parse(resume_content, resume_type)
+        parsed_resume, index_entry_id = parse_resume_with_dedup(resume_content, resume_type)
         
-        # Calculate match score using standardized criteria
-        logger.info("Calculating match score using standardized criteria")
-        match_result = job_matcher.calculate_match(parsed_resume, job_description)
+        # Reuse the match result of a near-duplicate resume for the same job if available
+        job_key = job_fingerprint(job_description)
+        cached_matches = resume_index.get_payload(index_entry_id)["matches"] if index_entry_id is not None else {}
+        if job_key in cached_matches:
+            logger.info("Reusing match result of near-duplicate resume")
+            adapted_result = copy.deepcopy(cached_matches[job_key])
+        else:
+            # Calculate match score using standardized criteria
+            logger.info("Calculating match score using standardized criteria")
+            match_result = job_matcher.calculate_match(parsed_resume, job_description)
+            
+            # Apply role-specific adaptations
+            logger.info("Applying role-specific adaptations to evaluation")
+            adapted_result = role_evaluator.adapt_evaluation(job_description, match_result)
+            
+            if index_entry_id is not None and is_cacheable_match(adapted_result):
+                resume_index.update_payload(index_entry_id, "matches",
+                                            dict(cached_matches, **{job_key: copy.deepcopy(adapted_result)}))
         
-        # Apply role-specific adaptations
-        logger.info("Applying role-specific adaptations to evaluation")
-        adapted_result = role_evaluator.adapt_evaluation(job_description, match_result)
         # Format response according to required template
         logger.info("Formatting final response")
-        formatted_response = response_formatter.format_response(adapted_result)
+        fields = requested_fields(data)
+        formatted_response = response_formatter.format_response(
+            project(adapted_result, fields) if fields else adapted_result
+        )
         
         # Add job ID if provided
         if job_id:
             formatted_response["job_info"]["job_id"] = job_id
         
-        return jsonify(formatted_response), 200
+        return json_response(formatted_response, 'match')
         
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
         return jsonify({"error": "An internal error occurred while processing the request"}), 500
 
 @app.route('/api/v1/parse-resume', methods=['POST'])
+@admission_controlled('interactive')
 def parse_resume_only():
     """
     Parse a resume without matching to a job description.
@@ -102,7 +263,9 @@ def parse_resume_only():
     Expected input format:
     {
         "resume": "Base64 encoded resume file or plain text",
-        "resume_type": "pdf/docx/txt"
+        "resume_type": "pdf/docx/txt",
+        "mode": "full/fast",         // Optional, "fast" extracts skills only without the LLM
+        "fields": ["skills", ...]    // Optional projection of the parsed resume (or ?fields=a,b.c)
     }
     """
     try:
@@ -119,18 +282,26 @@ def parse_resume_only():
         # Extract data
         resume_content = data['resume']
         resume_type = data.get('resume_type', 'txt')
+        mode = data.get('mode', 'full')
+        if mode not in ('full', 'fast'):
+            return jsonify({"error": "Invalid mode, expected 'full' or 'fast'"}), 400
         
         # Process resume
-        logger.info(f"Processing resume of type {resume_type}")
-        parsed_resume = resume_parser.parse(resume_content, resume_type)
+        logger.info(f"Processing resume of type {resume_type} in {mode} mode")
+        parsed_resume, _ = parse_resume_with_dedup(resume_content, resume_type, mode)
         
-        return jsonify(parsed_resume), 200
+        fields = requested_fields(data)
+        if fields:
+            parsed_resume = project(parsed_resume, fields)
+        
+        return json_response(parsed_resume, 'parse-resume')
         
     except Exception as e:
         logger.error(f"Error parsing resume: {str(e)}", exc_info=True)
         return jsonify({"error": "An internal error occurred while parsing the resume"}), 500
 
 @app.route('/api/v1/evaluate-role', methods=['POST'])
+@admission_controlled('interactive')
 def evaluate_role():
     """
     Determine the role type and provide adapted evaluation criteria.
@@ -168,12 +339,84 @@ def evaluate_role():
             "adapted_criteria": adapted_criteria["criteria"]
         }
         
-        return jsonify(result), 200
+        return json_response(result, 'evaluate-role')
         
     except Exception as e:
         logger.error(f"Error evaluating role: {str(e)}", exc_info=True)
         return jsonify({"error": "An internal error occurred while evaluating the role"}), 500
 
+@app.route('/api/v1/rescore', methods=['POST'])
+def rescore_candidates():
+    """
+    Start re-scoring stored match results after a job description was edited.
+    Only the criteria affected by the edit are re-evaluated. The work runs as
+    a background job; poll GET /api/v1/rescore/<job_id> for the results. Its
+    model calls are admitted as batch requests, or as background requests
+    with "X-Priority: background".
+    
+    Expected input format:
+    {
+        "previous_job_description": { ... },  // Job description the results were computed against
+        "job_description": { ... },           // Edited job description
+        "candidates": [
+            {
+                "candidate_id": "C123",        // Optional identifier echoed back
+                "parsed_resume": { ... },      // Result of /api/v1/parse-resume
+                "match_result": { ... }        // Stored "match_result" of /api/v1/match
+            }
+        ]
+    }
+    """
+    try:
+        # Validate request
+        if not request.is_json:
+            return jsonify({"error": "Request must be JSON"}), 400
+        
+        data = request.get_json()
+        
+        priority = request.headers.get('X-Priority', 'batch').lower()
+        if priority not in ('batch', 'background'):
+            return jsonify({"error": "Invalid X-Priority for re-scoring, expected batch or background"}), 400
+        
+        # Check for required fields
+        for field in ('previous_job_description', 'job_description', 'candidates'):
+            if field not in data:
+                return jsonify({"error": f"Missing required field: {field}"}), 400
+        
+        candidates = data['candidates']
+        for candidate in candidates:
+            if 'parsed_resume' not in candidate or 'match_result' not in candidate:
+                return jsonify({"error": "Each candidate requires parsed_resume and match_result"}), 400
+        
+        fields = requested_fields(data)
+        
+        def project_results(result):
+            for item in result["results"]:
+                item["match_result"] = project(item["match_result"], fields)
+            return result
+        
+        job = rescore_jobs.submit(data['previous_job_description'], data['job_description'], candidates,
+                                  transform=project_results if fields else None, priority=priority)
+        job["status_url"] = f"/api/v1/rescore/{job['job_id']}"
+        return json_response(job, 'rescore', status=202)
+        
+    except RescoreQueueFull as e:
+        logger.warning(f"Rejected re-scoring job: {e}")
+        response = jsonify({"error": "Too many re-scoring jobs are queued, retry later"})
+        response.headers['Retry-After'] = '60'
+        return response, 429
+    except Exception as e:
+        logger.error(f"Error re-scoring candidates: {str(e)}", exc_info=True)
+        return jsonify({"error": "An internal error occurred while re-scoring candidates"}), 500
+
+@app.route('/api/v1/rescore/<job_id>', methods=['GET'])
+def rescore_status(job_id):
+    """Return the status of a re-scoring job, including its results once it is done."""
+    job = rescore_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired re-scoring job"}), 404
+    return json_response(job, 'rescore')
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port)
\ No newline at end of file
@@ -0,0 +1,339 @@
+import os
+import sys
+import json
+import time
+import base64
+import hashlib
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dotenv import load_dotenv
+from resume_parser import ResumeParser
+from job_matcher import JobMatcher
+from role_evaluator import RoleEvaluator
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+SUPPORTED_TYPES = ('pdf', 'docx', 'txt')
+
+
+def load_jobs(jobs_path):
+    """
+    Load job descriptions from a JSONL file.
+
+    Each line is either a job description object or an object of the form
+    {"job_id": "...", "job_description": {...}}. Jobs without an explicit id
+    are keyed by their line number.
+
+    Returns:
+        List of (job_id, job_description) tuples
+    """
+    jobs = []
+    with open(jobs_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'job_description' in record:
+                job_description = record['job_description']
+                job_id = record.get('job_id') or job_description.get('job_id')
+            else:
+                job_description = record
+                job_id = record.get('job_id') or record.get('id')
+            jobs.append((str(job_id or f"line-{line_number}"), job_description))
+    return jobs
+
+
+def iter_resume_files(resume_dir):
+    """Yield (relative path, file type) for every supported resume file, in a stable order."""
+    for root, dirs, files in os.walk(resume_dir):
+        dirs.sort()
+        for name in sorted(files):
+            file_type = os.path.splitext(name)[1].lstrip('.').lower()
+            if file_type in SUPPORTED_TYPES:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, resume_dir), file_type
+
+
+def pair_key(resume_path, job_id):
+    """Stable key identifying one resume/job pair in the checkpoint."""
+    return hashlib.sha1(f"{resume_path}\0{job_id}".encode('utf-8')).hexdigest()
+
+
+def parse_failed(parsed_resume):
+    """Whether ResumeParser returned its fallback structure instead of a parsed resume."""
+    return parsed_resume.get("candidate_info", {}).get("name") == "Parsing Error"
+
+
+def match_failed(match_result):
+    """Whether a match result contains default criteria instead of a model evaluation."""
+    details = match_result.get("details", {})
+    return any(
+        isinstance(criterion, dict) and criterion.get("analysis") == "Error in processing"
+        for criterion in details.values()
+    )
+
+
+def load_completed_pairs(output_path):
+    """
+    Read the keys of successfully scored pairs from an existing results file.
+
+    The results file doubles as the checkpoint: every record is flushed as soon
+    as it is produced, so a crashed run leaves at most one truncated trailing
+    line, which is ignored. Failed pairs are not treated as completed and are
+    retried on the next run.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'error' not in record and 'pair_key' in record:
+                completed.add(record['pair_key'])
+    return completed
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class ProgressReporter:
+    """
+    Thread-safe progress counters with periodic throughput/ETA reporting.
+    """
+
+    def __init__(self, total_pairs, already_done, interval=5.0, stream=sys.stderr):
+        self.total_pairs = total_pairs
+        self.already_done = already_done
+        self.interval = interval
+        self.stream = stream
+        self.completed = 0
+        self.errors = 0
+        self.started_at = time.monotonic()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, ok):
+        with self._lock:
+            self.completed += 1
+            if not ok:
+                self.errors += 1
+
+    def maybe_report(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_report < self.interval:
+            return
+        self._last_report = now
+
+        with self._lock:
+            completed, errors = self.completed, self.errors
+        elapsed = max(now - self.started_at, 1e-6)
+        rate = completed / elapsed
+        done = self.already_done + completed
+        remaining = max(self.total_pairs - done, 0)
+        eta = remaining / rate if rate > 0 else float('inf')
+        eta_text = time.strftime('%H:%M:%S', time.gmtime(eta)) if eta != float('inf') else '--:--:--'
+
+        self.stream.write(
+            f"\r{done}/{self.total_pairs} pairs | {rate:.2f} pairs/s | "
+            f"ETA {eta_text} | errors {errors}   "
+        )
+        self.stream.flush()
+
+
+class BulkMatcher:
+    """
+    Scores a directory of resumes against a set of jobs using a worker pool,
+    writing results incrementally and resuming from previous runs.
+    """
+
+    def __init__(self, jobs, workers=8, resume_parser=None, job_matcher=None, role_evaluator=None):
+        self.jobs = jobs
+        self.workers = workers
+        self.resume_parser = resume_parser or ResumeParser()
+        self.job_matcher = job_matcher or JobMatcher()
+        self.role_evaluator = role_evaluator or RoleEvaluator()
+
+    def _read_resume(self, resume_dir, resume_path, file_type):
+        """Read a resume file into the content format expected by ResumeParser.parse."""
+        with open(os.path.join(resume_dir, resume_path), 'rb') as f:
+            raw = f.read()
+        if file_type == 'txt':
+            return raw.decode('utf-8', errors='replace')
+        return base64.b64encode(raw).decode('ascii')
+
+    def _process_resume(self, resume_dir, resume_path, file_type, pending_jobs):
+        """
+        Parse one resume and score it against every job still pending for it.
+
+        Parser and matcher fall back to default results instead of raising on
+        model errors (e.g. quota exhaustion); those are written as error records
+        so that they are counted and retried on the next run.
+
+        Returns:
+            List of result records, one per (resume, job) pair
+        """
+        records = []
+        try:
+            resume_content = self._read_resume(resume_dir, resume_path, file_type)
+            parsed_resume = self.resume_parser.parse(resume_content, file_type)
+            if parse_failed(parsed_resume):
+                raise ValueError("resume parser returned its fallback result")
+        except Exception as e:
+            logger.error(f"Error parsing resume {resume_path}: {e}")
+            for job_id, _ in pending_jobs:
+                records.append({
+                    "pair_key": pair_key(resume_path, job_id),
+                    "resume": resume_path,
+                    "job_id": job_id,
+                    "error": f"parse failed: {e}"
+                })
+            return records
+
+        for job_id, job_description in pending_jobs:
+            record = {
+                "pair_key": pair_key(resume_path, job_id),
+                "resume": resume_path,
+                "job_id": job_id
+            }
+            try:
+                match_result = self.job_matcher.calculate_match(parsed_resume, job_description)
+                if match_failed(match_result):
+                    raise ValueError("job matcher returned its fallback result")
+                adapted_result = self.role_evaluator.adapt_evaluation(job_description, match_result)
+                if "role_type" not in adapted_result:
+                    raise ValueError("role adaptation failed")
+                record["match_result"] = adapted_result
+            except Exception as e:
+                logger.error(f"Error matching {resume_path} against job {job_id}: {e}")
+                record["error"] = str(e)
+            records.append(record)
+        return records
+
+    def run(self, resume_dir, output_path, progress_interval=5.0):
+        """
+        Score every resume in resume_dir against every job, appending to output_path.
+
+        Pairs already present in output_path are skipped, so an interrupted
+        run can simply be restarted with the same arguments.
+
+        Returns:
+            The ProgressReporter holding the final counters
+        """
+        completed = load_completed_pairs(output_path)
+        resume_files = list(iter_resume_files(resume_dir))
+        total_pairs = len(resume_files) * len(self.jobs)
+        logger.info(
+            f"{len(resume_files)} resumes x {len(self.jobs)} jobs = {total_pairs} pairs, "
+            f"{len(completed)} already completed"
+        )
+
+        progress = ProgressReporter(total_pairs, len(completed), interval=progress_interval)
+        # Bound in-flight work so that memory stays flat regardless of input size
+        max_in_flight = self.workers * 2
+
+        output = open(output_path, 'a', encoding='utf-8')
+        if output.tell() > 0 and not _ends_with_newline(output_path):
+            # Terminate a line truncated by a crash, so the next record is not appended to it
+            output.write("\n")
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        in_flight = set()
+
+        def drain(block):
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.discard(future)
+                for record in future.result():
+                    output.write(json.dumps(record) + "\n")
+                    progress.record('error' not in record)
+                output.flush()
+            progress.maybe_report()
+
+        try:
+            for resume_path, file_type in resume_files:
+                pending_jobs = [
+                    (job_id, job_description) for job_id, job_description in self.jobs
+                    if pair_key(resume_path, job_id) not in completed
+                ]
+                if not pending_jobs:
+                    continue
+
+                while len(in_flight) >= max_in_flight:
+                    drain(block=True)
+                in_flight.add(executor.submit(
+                    self._process_resume, resume_dir, resume_path, file_type, pending_jobs
+                ))
+                drain(block=False)
+
+            while in_flight:
+                drain(block=True)
+        except KeyboardInterrupt:
+            # Drop resumes that have not started, and save the ones already being processed
+            for future in list(in_flight):
+                if future.cancel():
+                    in_flight.discard(future)
+            logger.warning(f"Interrupted; finishing {len(in_flight)} resumes in progress "
+                           f"(press Ctrl-C again to stop immediately)")
+            while in_flight:
+                drain(block=True)
+            raise
+        finally:
+            # A second interrupt leaves running resumes unsaved; they are retried on the next run
+            executor.shutdown(wait=False, cancel_futures=True)
+            output.close()
+
+        progress.maybe_report(force=True)
+        progress.stream.write("\n")
+        return progress
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description="Score a directory of resumes against a JSONL file of job descriptions."
+    )
+    arg_parser.add_argument('resume_dir', help="Directory containing pdf/docx/txt resumes")
+    arg_parser.add_argument('jobs', help="JSONL file with one job description per line")
+    arg_parser.add_argument('-o', '--output', default='match_results.jsonl',
+                            help="JSONL results file, also used as the resume checkpoint")
+    arg_parser.add_argument('-w', '--workers', type=int, default=int(os.environ.get('BULK_MATCH_WORKERS', 8)),
+                            help="Number of concurrent extraction/LLM workers")
+    arg_parser.add_argument('--progress-interval', type=float, default=5.0,
+                            help="Seconds between progress updates")
+    args = arg_parser.parse_args(argv)
+
+    jobs = load_jobs(args.jobs)
+    if not jobs:
+        logger.error(f"No jobs found in {args.jobs}")
+        return 1
+
+    bulk_matcher = BulkMatcher(jobs, workers=args.workers)
+    try:
+        progress = bulk_matcher.run(args.resume_dir, args.output, progress_interval=args.progress_interval)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; completed pairs are saved and will be skipped on the next run")
+        return 130
+
+    return 1 if progress.errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
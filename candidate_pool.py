@@ -0,0 +1,414 @@
+import re
+import sys
+import json
+import logging
+from array import array
+from datetime import date
+from skill_extractor import get_skill_extractor, normalize_term
+
+logger = logging.getLogger(__name__)
+
+# Ordered so that a higher level means a higher degree
+EDUCATION_LEVELS = ("none", "high_school", "associate", "bachelor", "master", "doctorate")
+_EDUCATION_KEYWORDS = (
+    (5, ("phd", "ph.d", "doctor", "doctorate", "dphil", "md", "jd")),
+    (4, ("master", "msc", "m.sc", "ms", "m.s", "ma", "m.a", "mba", "meng", "m.eng", "mphil")),
+    (3, ("bachelor", "bsc", "b.sc", "bs", "b.s", "ba", "b.a", "beng", "b.eng", "btech", "b.tech", "licence", "undergraduate")),
+    (2, ("associate", "aa", "as", "hnd")),
+    (1, ("high school", "secondary", "ged", "baccalaureate", "a-levels")),
+)
+_MONTHS = {
+    name: index for index, names in enumerate((
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december")
+    )) for name in names
+}
+_YEAR_RE = re.compile(r"\b(19\d{2}|20\d{2})\b")
+_NUMERIC_MONTH_RE = re.compile(r"\b(\d{1,2})[/\-.](19\d{2}|20\d{2})\b|\b(19\d{2}|20\d{2})[/\-.](\d{1,2})\b")
+_WORD_RE = re.compile(r"[a-z][a-z.\-]*")
+_CURRENT_WORDS = frozenset(("present", "current", "now", "today", "ongoing"))
+
+
+def education_level(degree):
+    """Map a free-text degree, or an EDUCATION_LEVELS name, to an index into EDUCATION_LEVELS."""
+    text = normalize_term(degree or "")
+    if text in EDUCATION_LEVELS:
+        # Level names written by CandidatePool.to_parsed()
+        return EDUCATION_LEVELS.index(text)
+    words = {word.strip('.') for word in _WORD_RE.findall(text)}
+    for level, keywords in _EDUCATION_KEYWORDS:
+        for keyword in keywords:
+            if keyword in words or (' ' in keyword and keyword in text):
+                return level
+    return 0
+
+
+def _parse_month(value, today):
+    """Convert a resume date string to a month ordinal (year * 12 + month), or None."""
+    text = normalize_term(value or "")
+    if not text:
+        return None
+    if any(word.strip('.-') in _CURRENT_WORDS for word in _WORD_RE.findall(text)):
+        return today.year * 12 + today.month - 1
+
+    numeric = _NUMERIC_MONTH_RE.search(text)
+    if numeric:
+        if numeric.group(1):
+            month, year = int(numeric.group(1)), int(numeric.group(2))
+        else:
+            year, month = int(numeric.group(3)), int(numeric.group(4))
+        if 1 <= month <= 12:
+            return year * 12 + month - 1
+
+    year = _YEAR_RE.search(text)
+    if not year:
+        return None
+    month = next((_MONTHS[word] for word in _WORD_RE.findall(text) if word in _MONTHS), 0)
+    return int(year.group(1)) * 12 + month
+
+
+def years_of_experience(experience, today=None):
+    """
+    Total years of experience from the parser's experience list.
+
+    Overlapping roles are merged so that concurrent positions are not
+    counted twice. Roles with an unparseable start date are ignored.
+    """
+    today = today or date.today()
+    intervals = []
+    for role in experience or []:
+        if not isinstance(role, dict):
+            continue
+        start = _parse_month(role.get("start_date"), today)
+        end = _parse_month(role.get("end_date") or "present", today)
+        if start is None or end is None or end < start:
+            continue
+        intervals.append((start, end + 1))
+
+    total_months = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total_months += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total_months += current_end - current_start
+    return total_months / 12.0
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate memory footprint of a nested structure of builtins, in bytes."""
+    _seen = _seen if _seen is not None else set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, _seen) + deep_sizeof(value, _seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, _seen) for item in obj)
+    return size
+
+
+class _Vocabulary:
+    """Interns strings to dense integer ids."""
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def intern(self, name):
+        key = normalize_term(name)
+        term_id = self.ids.get(key)
+        if term_id is None:
+            term_id = len(self.names)
+            self.ids[key] = term_id
+            self.names.append(name)
+        return term_id
+
+    def get(self, name):
+        return self.ids.get(normalize_term(name))
+
+    def memory_usage(self):
+        return deep_sizeof(self.ids) + deep_sizeof(self.names)
+
+
+class CandidatePool:
+    """
+    Compact in-memory store of parsed resumes for fast filtering and re-ranking.
+
+    Only the fields needed for screening are kept: interned skills and
+    certifications, total years of experience and highest education level.
+    Scalar fields live in typed arrays (one entry per candidate); skills and
+    certifications are stored as flat id arrays with per-candidate offsets,
+    plus a posting list per skill for fast "has skills A and B" filters.
+    """
+
+    def __init__(self, skill_extractor=None):
+        self.skill_extractor = skill_extractor or get_skill_extractor()
+        self.candidate_ids = []
+        self._years = array('f')
+        self._education = array('B')
+
+        self._skills = _Vocabulary()
+        self._skill_soft = array('B')           # skill id -> 1 if soft skill
+        self._skill_values = array('I')
+        self._skill_offsets = array('I', [0])
+        self._skill_postings = []               # skill id -> array('I') of rows
+
+        self._certs = _Vocabulary()
+        self._cert_values = array('I')
+        self._cert_offsets = array('I', [0])
+        self._cert_postings = []
+
+        # Size of the added resumes in their dict form, to report the memory saving
+        self._dict_bytes = 0
+
+    def __len__(self):
+        return len(self.candidate_ids)
+
+    def _intern_skill(self, name, soft):
+        skill_id = self._skills.intern(self.skill_extractor.normalize(name))
+        if skill_id == len(self._skill_postings):
+            self._skill_postings.append(array('I'))
+            self._skill_soft.append(1 if soft else 0)
+        return skill_id
+
+    def _intern_cert(self, name):
+        cert_id = self._certs.intern(name.strip())
+        if cert_id == len(self._cert_postings):
+            self._cert_postings.append(array('I'))
+        return cert_id
+
+    def add(self, candidate_id, parsed_resume):
+        """
+        Add a candidate from the parser's JSON schema.
+
+        Args:
+            candidate_id: Identifier of the candidate (e.g. email or application id)
+            parsed_resume: Structured resume data as returned by ResumeParser
+
+        Returns:
+            Row index of the candidate
+        """
+        row = len(self.candidate_ids)
+        skills = parsed_resume.get("skills") or {}
+
+        skill_ids = []
+        for soft, category in ((False, "technical"), (True, "soft")):
+            for name in skills.get(category) or []:
+                if isinstance(name, str) and name.strip():
+                    skill_ids.append(self._intern_skill(name, soft))
+        skill_ids = sorted(set(skill_ids))
+
+        cert_ids = set()
+        for certification in parsed_resume.get("certifications") or []:
+            name = certification.get("name") if isinstance(certification, dict) else certification
+            if isinstance(name, str) and name.strip():
+                cert_ids.add(self._intern_cert(name))
+        cert_ids = sorted(cert_ids)
+
+        education = max(
+            (education_level(entry.get("degree")) for entry in parsed_resume.get("education") or []
+             if isinstance(entry, dict)),
+            default=0
+        )
+
+        experience = parsed_resume.get("experience")
+        if experience or not parsed_resume.get("total_years_experience"):
+            years = years_of_experience(experience)
+        else:
+            # Summary written by to_parsed()
+            years = float(parsed_resume["total_years_experience"])
+
+        self._dict_bytes += deep_sizeof(parsed_resume)
+        self.candidate_ids.append(str(candidate_id))
+        self._years.append(years)
+        self._education.append(education)
+        self._skill_values.extend(skill_ids)
+        self._skill_offsets.append(len(self._skill_values))
+        for skill_id in skill_ids:
+            self._skill_postings[skill_id].append(row)
+        self._cert_values.extend(cert_ids)
+        self._cert_offsets.append(len(self._cert_values))
+        for cert_id in cert_ids:
+            self._cert_postings[cert_id].append(row)
+        return row
+
+    def load(self, records):
+        """
+        Add candidates from an iterable of (candidate_id, parsed_resume) pairs.
+
+        Returns:
+            Number of candidates added
+        """
+        count = 0
+        for candidate_id, parsed_resume in records:
+            self.add(candidate_id, parsed_resume)
+            count += 1
+        return count
+
+    def load_jsonl(self, path, id_field="candidate_id"):
+        """
+        Load candidates from a JSONL file of parsed resumes.
+
+        Each line is a parsed resume; the candidate id is read from id_field,
+        falling back to the candidate's email and then the line number.
+        """
+        def records():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    parsed_resume = json.loads(line)
+                    candidate_id = (parsed_resume.get(id_field)
+                                    or (parsed_resume.get("candidate_info") or {}).get("email")
+                                    or f"line-{line_number}")
+                    yield candidate_id, parsed_resume
+
+        return self.load(records())
+
+    def skills(self, row):
+        """Canonical skill names of a candidate."""
+        names = self._skills.names
+        return [names[skill_id] for skill_id in
+                self._skill_values[self._skill_offsets[row]:self._skill_offsets[row + 1]]]
+
+    def certifications(self, row):
+        """Certification names of a candidate."""
+        names = self._certs.names
+        return [names[cert_id] for cert_id in
+                self._cert_values[self._cert_offsets[row]:self._cert_offsets[row + 1]]]
+
+    def years(self, row):
+        return self._years[row]
+
+    def education(self, row):
+        return EDUCATION_LEVELS[self._education[row]]
+
+    def to_parsed(self, row):
+        """
+        Dump a candidate back to the parser's JSON schema.
+
+        Only the retained screening fields are populated: experience is
+        summarized as "total_years_experience" and education as the highest
+        degree level.
+        """
+        skill_ids = self._skill_values[self._skill_offsets[row]:self._skill_offsets[row + 1]]
+        names = self._skills.names
+        level = self._education[row]
+        return {
+            "candidate_id": self.candidate_ids[row],
+            "candidate_info": {"name": "", "email": ""},
+            "skills": {
+                "technical": [names[skill_id] for skill_id in skill_ids if not self._skill_soft[skill_id]],
+                "soft": [names[skill_id] for skill_id in skill_ids if self._skill_soft[skill_id]]
+            },
+            "total_years_experience": round(self._years[row], 2),
+            "experience": [],
+            "education": [{"degree": EDUCATION_LEVELS[level]}] if level else [],
+            "certifications": [{"name": name} for name in self.certifications(row)],
+            "languages": [],
+            "projects": []
+        }
+
+    def dump_jsonl(self, path):
+        """Write every candidate to a JSONL file in the parser's schema."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for row in range(len(self)):
+                f.write(json.dumps(self.to_parsed(row)) + "\n")
+
+    def filter(self, skills=(), certifications=(), min_years=None, min_education=None):
+        """
+        Select candidates matching all of the given conditions.
+
+        Args:
+            skills: Skill names (any alias) the candidate must all have
+            certifications: Certification names the candidate must all have
+            min_years: Minimum total years of experience
+            min_education: Minimum education level name from EDUCATION_LEVELS
+
+        Returns:
+            List of matching row indexes, in insertion order
+        """
+        postings = []
+        for name in skills:
+            skill_id = self._skills.get(self.skill_extractor.normalize(name))
+            if skill_id is None:
+                return []
+            postings.append(self._skill_postings[skill_id])
+        for name in certifications:
+            cert_id = self._certs.get(name.strip())
+            if cert_id is None:
+                return []
+            postings.append(self._cert_postings[cert_id])
+
+        if postings:
+            # Start from the rarest term and intersect the others into it
+            postings.sort(key=len)
+            rows = set(postings[0])
+            for posting in postings[1:]:
+                rows.intersection_update(posting)
+                if not rows:
+                    return []
+            rows = sorted(rows)
+        else:
+            rows = range(len(self))
+
+        if min_years is not None:
+            years = self._years
+            rows = [row for row in rows if years[row] >= min_years]
+        if min_education is not None:
+            level = EDUCATION_LEVELS.index(min_education)
+            education = self._education
+            rows = [row for row in rows if education[row] >= level]
+        return list(rows)
+
+    def select(self, **conditions):
+        """Like filter(), but return candidate ids."""
+        return [self.candidate_ids[row] for row in self.filter(**conditions)]
+
+    def memory_usage(self):
+        """
+        Report the memory used by the pool.
+
+        The dict form of the added resumes is measured as they are added, so
+        "dict_bytes_per_candidate" and "reduction" (dict size divided by pool
+        size; the target is at least 10) compare the two representations.
+
+        Returns:
+            Dict with the total bytes, bytes per candidate, the comparison with
+            the dict form and a per-component breakdown
+        """
+        def array_bytes(values):
+            return sys.getsizeof(values)
+
+        components = {
+            "candidate_ids": deep_sizeof(self.candidate_ids),
+            "scalar_columns": array_bytes(self._years) + array_bytes(self._education),
+            "skills": (array_bytes(self._skill_values) + array_bytes(self._skill_offsets)
+                       + array_bytes(self._skill_soft)),
+            "skill_postings": sys.getsizeof(self._skill_postings)
+                              + sum(array_bytes(posting) for posting in self._skill_postings),
+            "certifications": array_bytes(self._cert_values) + array_bytes(self._cert_offsets),
+            "certification_postings": sys.getsizeof(self._cert_postings)
+                                      + sum(array_bytes(posting) for posting in self._cert_postings),
+            "vocabularies": self._skills.memory_usage() + self._certs.memory_usage()
+        }
+        total = sum(components.values())
+        return {
+            "candidates": len(self),
+            "total_bytes": total,
+            "bytes_per_candidate": total / len(self) if len(self) else 0.0,
+            "dict_bytes": self._dict_bytes,
+            "dict_bytes_per_candidate": self._dict_bytes / len(self) if len(self) else 0.0,
+            "reduction": round(self._dict_bytes / total, 1) if len(self) else 0.0,
+            "components": components
+        }
@@ -3,6 +3,8 @@ import json
 import logging
 import google.generativeai as genai
 from dotenv import load_dotenv
+from skill_extractor import get_skill_extractor
+from llm_json import StreamingJSONDecoder, generate_json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,16 +19,76 @@ try:
     if not GOOGLE_API_KEY:
         logger.warning("GOOGLE_API_KEY environment variable not set")
     
-    genai.configure(api_key=GOOGLE_API_KEY)
+    # Optional alternative endpoint, e.g. the fake Gemini server used by load_harness.py
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GOOGLE_API_KEY, transport='rest',
+                        client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GOOGLE_API_KEY)
 except Exception as e:
     logger.error(f"Error initializing Gemini API: {e}")
 
+# Standard evaluation criteria and their weights (percent of the overall score)
+CRITERIA_WEIGHTS = {
+    "skills_match": 35,
+    "relevant_experience": 25,
+    "education": 10,
+    "certifications": 10,
+    "cultural_fit": 10,
+    "language_proficiency": 5,
+    "achievements_projects": 5
+}
+CRITERIA_DESCRIPTIONS = {
+    "skills_match": "Alignment of technical, soft, and domain-specific skills with job requirements",
+    "relevant_experience": "Years and type of work experience related to the role or industry",
+    "education": "Degree level, field of study, and institution relevance",
+    "certifications": "Relevant professional certifications that enhance qualifications",
+    "cultural_fit": "Alignment with company values, mission, and team environment",
+    "language_proficiency": "Required language fluency for communication and documentation",
+    "achievements_projects": "Notable accomplishments, publications, or standout projects"
+}
+
+def interpret_score(score):
+    """Interpretation of an overall score out of 100."""
+    if score >= 85:
+        return "Excellent Fit – Highly recommended"
+    if score >= 70:
+        return "Good Fit – Strong candidate, minor gaps"
+    if score >= 50:
+        return "Moderate Fit – May need development/support"
+    return "Poor Fit – Likely not a match"
+
+def recompute_overall_score(match_result):
+    """
+    Re-derive weighted and overall scores of a match result from its criterion raw scores.
+
+    Updates the result in place, using the same scales as calculate_match:
+    "raw_score" out of 100 and "score" from 0.0 to 1.0.
+    """
+    details = match_result.get("details", {})
+    total = 0.0
+    for criterion, weight in CRITERIA_WEIGHTS.items():
+        criterion_result = details.get(criterion)
+        if not isinstance(criterion_result, dict):
+            continue
+        weighted_score = round(float(criterion_result.get("raw_score", 0)) / 10 * weight, 2)
+        criterion_result["weighted_score"] = weighted_score
+        total += weighted_score
+
+    match_result["raw_score"] = round(total, 1)
+    match_result["score"] = round(total / 100.0, 3)
+    match_result["interpretation"] = interpret_score(total)
+    return match_result
+
 class JobMatcher:
     def __init__(self):
         """Initialize the Job Matcher with Gemini model."""
         try:
             # Use Gemini Pro model for text processing
             self.model = genai.GenerativeModel('gemini-1.5-flash')
+            # Used to canonicalize matching/missing skills like the parser output
+            self.skill_extractor = get_skill_extractor()
         except Exception as e:
             logger.error(f"Failed to initialize Gemini model: {e}")
             raise
@@ -141,49 +203,127 @@ class JobMatcher:
             Return ONLY the JSON without any additional text or explanations.
             """
             
-            # Generate response from Gemini
-            response = self.model.generate_content(prompt)
+            # Generate response from Gemini and decode the JSON as it streams in
+            decoder = StreamingJSONDecoder()
+            match_data = generate_json(self.model, prompt, decoder=decoder)
             
-            # Extract JSON from response
-            result_text = response.text
-            # Clean up the response if needed to ensure valid JSON
-            result_text = result_text.strip()
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            # Parse JSON
-            match_data = json.loads(result_text)
+            # A truncated response may have been repaired into a partial result
+            if not isinstance(match_data.get("score"), (int, float)):
+                raise ValueError("Model output is missing score")
+            details = match_data.get("details")
+            if not isinstance(details, dict):
+                raise ValueError("Model output is missing details")
+            missing = [criterion for criterion in CRITERIA_WEIGHTS
+                       if not isinstance(details.get(criterion), dict) or "raw_score" not in details[criterion]]
+            if missing:
+                logger.warning(f"Model output is missing criteria {', '.join(missing)}; using defaults")
+                defaults = self.default_result()["details"]
+                for criterion in missing:
+                    details[criterion] = defaults[criterion]
+            match_data.setdefault("interpretation", interpret_score(match_data["score"]))
+            match_data.setdefault("red_flags", [])
+            match_data.setdefault("bonus_points", [])
+            if decoder.repaired or missing:
+                # Keeps the result out of caches
+                match_data["repaired"] = True
             
             # Convert score to standard 0.0-1.0 format for compatibility with outer API
-            if "score" in match_data:
-                # Store the original score for reference
-                match_data["raw_score"] = match_data["score"]
-                # Convert from 0-100 to 0.0-1.0
-                match_data["score"] = match_data["score"] / 100.0
-            else:
-                match_data["score"] = 0.5
+            # Store the original score for reference
+            match_data["raw_score"] = match_data["score"]
+            # Convert from 0-100 to 0.0-1.0
+            match_data["score"] = match_data["score"] / 100.0
+            
+            # Canonicalize skill names so they compare equal to parsed resume skills
+            skills_match = match_data.get("details", {}).get("skills_match")
+            if isinstance(skills_match, dict):
+                for key in ("matching_skills", "missing_skills"):
+                    if isinstance(skills_match.get(key), list):
+                        skills_match[key] = self.skill_extractor.normalize_skills(skills_match[key])
             
             return match_data
             
         except Exception as e:
             logger.error(f"Error calculating match score: {e}")
             # Return a default score if matching fails
-            return {
-                "score": 0.5,
-                "raw_score": 50,
-                "interpretation": "Moderate Fit – May need development/support",
-                "details": {
-                    "skills_match": {"raw_score": 5, "weighted_score": 17.5, "matching_skills": [], "missing_skills": [], "analysis": "Error in processing"},
-                    "relevant_experience": {"raw_score": 5, "weighted_score": 12.5, "analysis": "Error in processing"},
-                    "education": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
-                    "certifications": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
-                    "cultural_fit": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
-                    "language_proficiency": {"raw_score": 5, "weighted_score": 2.5, "analysis": "Error in processing"},
-                    "achievements_projects": {"raw_score": 5, "weighted_score": 2.5, "analysis": "Error in processing"}
-                },
-                "red_flags": ["Error processing candidate data"],
-                "bonus_points": []
-            }
\ No newline at end of file
+            return self.default_result()
+
+    @staticmethod
+    def default_result():
+        """Neutral match result returned when matching fails."""
+        return {
+            "score": 0.5,
+            "raw_score": 50,
+            "interpretation": "Moderate Fit – May need development/support",
+            "details": {
+                "skills_match": {"raw_score": 5, "weighted_score": 17.5, "matching_skills": [], "missing_skills": [], "analysis": "Error in processing"},
+                "relevant_experience": {"raw_score": 5, "weighted_score": 12.5, "analysis": "Error in processing"},
+                "education": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
+                "certifications": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
+                "cultural_fit": {"raw_score": 5, "weighted_score": 5, "analysis": "Error in processing"},
+                "language_proficiency": {"raw_score": 5, "weighted_score": 2.5, "analysis": "Error in processing"},
+                "achievements_projects": {"raw_score": 5, "weighted_score": 2.5, "analysis": "Error in processing"}
+            },
+            "red_flags": ["Error processing candidate data"],
+            "bonus_points": []
+        }
+
+    def score_criteria(self, parsed_resume, job_description, criteria):
+        """
+        Re-evaluate only some of the standard criteria for a candidate.
+
+        Args:
+            parsed_resume: Structured resume data as returned by ResumeParser
+            job_description: Job description data
+            criteria: Criterion keys from CRITERIA_WEIGHTS to evaluate
+
+        Returns:
+            Dict mapping each criterion to its result ({"raw_score", "analysis", ...})
+
+        Raises:
+            ValueError: If the model output misses a requested criterion
+        """
+        resume_json = json.dumps(parsed_resume)
+        job_json = json.dumps(job_description)
+        criteria_list = "\n".join(
+            f"            - {criterion}: {CRITERIA_DESCRIPTIONS[criterion]}" for criterion in criteria
+        )
+        example = {
+            criterion: dict({"raw_score": 8, "analysis": "..."},
+                            **({"matching_skills": [], "missing_skills": []} if criterion == "skills_match" else {}))
+            for criterion in criteria
+        }
+
+        prompt = f"""
+            You are an expert AI recruitment assistant. Evaluate a candidate's resume against a job description
+            on the following criteria only:
+{criteria_list}
+
+            Resume Data:
+            ```json
+            {resume_json}
+            ```
+
+            Job Description:
+            ```json
+            {job_json}
+            ```
+
+            Rate each criterion on a 0-10 scale and explain the rating briefly.
+
+            Return a JSON response in the following format:
+            {json.dumps({"details": example}, indent=4)}
+
+            Return ONLY the JSON without any additional text or explanations.
+            """
+
+        details = generate_json(self.model, prompt).get("details", {})
+        missing = [criterion for criterion in criteria if not isinstance(details.get(criterion), dict)]
+        if missing:
+            raise ValueError(f"Model output is missing criteria: {', '.join(missing)}")
+
+        skills_match = details.get("skills_match")
+        if skills_match:
+            for key in ("matching_skills", "missing_skills"):
+                if isinstance(skills_match.get(key), list):
+                    skills_match[key] = self.skill_extractor.normalize_skills(skills_match[key])
+        return {criterion: details[criterion] for criterion in criteria}
@@ -0,0 +1,283 @@
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Stream model output by default; set GEMINI_STREAMING=0 to wait for complete responses
+STREAMING_ENABLED = os.getenv('GEMINI_STREAMING', '1').lower() not in ('0', 'false', 'no')
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def sanitize_json(text):
+    """
+    Remove common LLM deviations from strict JSON.
+
+    Drops "#" and "//" comments (the prompts' examples contain them) and
+    trailing commas before a closing bracket, leaving string contents intact.
+    """
+    out = []
+    in_string = escape = False
+    i, length = 0, len(text)
+    while i < length:
+        char = text[i]
+        if in_string:
+            out.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            out.append(char)
+        elif char == '#' or text.startswith('//', i):
+            while i < length and text[i] != '\n':
+                i += 1
+            continue
+        elif char in '}]':
+            # Drop a trailing comma (and whitespace) before the closing bracket
+            j = len(out) - 1
+            while j >= 0 and out[j].isspace():
+                j -= 1
+            if j >= 0 and out[j] == ',':
+                del out[j:]
+            out.append(char)
+        else:
+            out.append(char)
+        i += 1
+    return ''.join(out)
+
+
+class StreamingJSONDecoder:
+    """
+    Incremental decoder for a JSON object produced by a streaming LLM response.
+
+    Text is fed chunk by chunk. Leading prose or a ```json fence is skipped,
+    and every top-level field of the object is decoded and reported as soon
+    as its value is complete, so callers can act on e.g. "score" before the
+    rest of the generation arrives. finish() returns the full object, or a
+    best-effort repair when the output was truncated or malformed.
+    """
+
+    def __init__(self, on_field=None):
+        """
+        Args:
+            on_field: Optional callback invoked as on_field(key, value) for
+                each completed top-level field
+        """
+        self.on_field = on_field
+        self.fields = {}
+        self.complete = False
+        # Set by finish() when the object had to be repaired or pieced together
+        self.repaired = False
+        self._text = ''
+        self._pos = 0
+        self._start = None          # index of the top-level "{"
+        self._end = None            # index just past the matching "}"
+        self._member_start = None
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._comment_start = None  # index of an open "#" or "//" comment
+
+    def feed(self, chunk):
+        """
+        Consume the next chunk of model output.
+
+        Returns:
+            List of (key, value) pairs completed by this chunk
+        """
+        if self.complete or not chunk:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+
+        pos = self._pos
+        while pos < len(text):
+            char = text[pos]
+            if self._start is None:
+                if char == '{':
+                    self._start = pos
+                    self._member_start = pos + 1
+                    self._stack.append('{')
+                pos += 1
+                continue
+
+            if self._comment_start is not None:
+                # Comments (the prompts' examples contain them) run to the end of the line
+                if char == '\n':
+                    self._comment_start = None
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '#':
+                self._comment_start = pos
+            elif char == '/':
+                if pos + 1 == len(text):
+                    # Could be the start of "//"; wait for the next chunk
+                    break
+                if text[pos + 1] == '/':
+                    self._comment_start = pos
+            elif char in '{[':
+                self._stack.append(char)
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    completed.extend(self._complete_member(text[self._member_start:pos]))
+                    self._end = pos + 1
+                    self.complete = True
+                    pos += 1
+                    break
+            elif char == ',' and len(self._stack) == 1:
+                completed.extend(self._complete_member(text[self._member_start:pos]))
+                self._member_start = pos + 1
+            pos += 1
+        self._pos = pos
+
+        return completed
+
+    def _complete_member(self, member):
+        """Decode one top-level "key": value member and report it."""
+        if not member.strip():
+            return []
+        try:
+            decoded = json.loads('{' + member + '}')
+        except ValueError:
+            try:
+                decoded = json.loads('{' + sanitize_json(member) + '}')
+            except ValueError:
+                logger.debug(f"Could not decode streamed member: {member[:80]!r}")
+                return []
+
+        completed = []
+        for key, value in decoded.items():
+            self.fields[key] = value
+            completed.append((key, value))
+            if self.on_field:
+                try:
+                    self.on_field(key, value)
+                except Exception as e:
+                    logger.error(f"Error in streamed field callback for {key}: {e}")
+        return completed
+
+    def _repair_truncated(self):
+        """Close an object cut off mid-generation so that its partial content can be decoded."""
+        if self._comment_start is not None:
+            text = self._text[self._start:self._comment_start]
+        else:
+            text = self._text[self._start:]
+        if self._in_string:
+            if self._escape:
+                text = text[:-1]
+            text += '"'
+        text = text.rstrip()
+        while text and text[-1] in ',:':
+            if text[-1] == ':':
+                text += ' null'
+                break
+            text = text[:-1].rstrip()
+        return text + ''.join(_CLOSERS[opener] for opener in reversed(self._stack))
+
+    def finish(self):
+        """
+        Return the decoded object.
+
+        Tries, in order: the complete object as produced, the object with
+        comments and trailing commas removed, a truncated object with its
+        open strings and brackets closed, and finally the top-level fields
+        that were completed while streaming.
+
+        Raises:
+            ValueError: If no JSON object could be recovered at all
+        """
+        if self._start is None:
+            raise ValueError("No JSON object found in model output")
+
+        if self.complete:
+            candidates = [self._text[self._start:self._end]]
+        else:
+            candidates = [self._repair_truncated()]
+            self.repaired = True
+            logger.warning("Model output was truncated; attempting to repair it")
+
+        for candidate in candidates + [sanitize_json(candidate) for candidate in candidates]:
+            try:
+                data = json.loads(candidate)
+            except ValueError:
+                continue
+            if isinstance(data, dict):
+                return data
+
+        if self.fields:
+            logger.warning(f"Recovered {len(self.fields)} complete fields from malformed model output")
+            self.repaired = True
+            return dict(self.fields)
+        raise ValueError("Could not decode JSON from model output")
+
+
+def decode_json(text):
+    """Decode a complete (possibly fenced or slightly malformed) model response."""
+    decoder = StreamingJSONDecoder()
+    decoder.feed(text)
+    return decoder.finish()
+
+
+def generate_json(model, prompt, on_field=None, stream=None, decoder=None):
+    """
+    Generate content and decode the JSON object in the response.
+
+    With streaming enabled, output is decoded as it arrives and on_field is
+    called for each top-level field as soon as it is complete. If the stream
+    fails part-way, whatever was received is still repaired and returned
+    rather than discarding the generation.
+
+    Args:
+        model: Gemini GenerativeModel
+        prompt: Prompt text
+        on_field: Optional callback on_field(key, value) for completed fields
+        stream: Override STREAMING_ENABLED for this call
+        decoder: Optional StreamingJSONDecoder to decode with, e.g. to check
+            decoder.repaired afterwards; on_field is ignored when given
+
+    Returns:
+        Decoded JSON object
+
+    Raises:
+        ValueError: If no JSON object could be recovered
+    """
+    decoder = decoder or StreamingJSONDecoder(on_field)
+    stream = STREAMING_ENABLED if stream is None else stream
+
+    if not stream:
+        decoder.feed(model.generate_content(prompt).text)
+        return decoder.finish()
+
+    received = False
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only a finish reason)
+                continue
+            received = True
+            decoder.feed(text)
+            if decoder.complete:
+                break
+    except Exception as e:
+        if not received:
+            raise
+        logger.warning(f"Model stream failed after partial output, salvaging it: {e}")
+
+    return decoder.finish()
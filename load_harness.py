@@ -0,0 +1,617 @@
+import os
+import sys
+import json
+import time
+import base64
+import random
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    "match": "/api/v1/match",
+    "parse-resume": "/api/v1/parse-resume",
+    "evaluate-role": "/api/v1/evaluate-role"
+}
+
+# Canned model outputs, selected by recognizing the prompt of each call site
+FAKE_PARSED_RESUME = {
+    "candidate_info": {
+        "name": "Jane Doe", "email": "jane.doe@example.com", "phone": "+1 555 0100",
+        "location": {"city": "Austin", "state": "TX", "country": "USA"},
+        "linkedin": "linkedin.com/in/janedoe", "website": ""
+    },
+    "skills": {"technical": ["Python", "Java", "Spring Boot", "Docker", "AWS"], "soft": ["Communication", "Leadership"]},
+    "experience": [{
+        "company": "Acme Corp", "title": "Senior Software Engineer", "location": "Austin, TX",
+        "start_date": "Jan 2019", "end_date": "Present",
+        "responsibilities": ["Designed microservices", "Led code reviews"], "achievements": ["Cut latency by 40%"]
+    }],
+    "education": [{
+        "degree": "Bachelor of Science", "field_of_study": "Computer Science", "institution": "UT Austin",
+        "location": "Austin, TX", "start_date": "2011", "end_date": "2015"
+    }],
+    "certifications": [{"name": "AWS Certified Developer", "issuer": "Amazon", "date": "2021", "expires": "2024"}],
+    "languages": [{"language": "English", "proficiency": "Native"}],
+    "projects": []
+}
+FAKE_MATCH = {
+    "score": 78,
+    "interpretation": "Good Fit – Strong candidate, minor gaps",
+    "details": {
+        "skills_match": {"raw_score": 8, "weighted_score": 28, "matching_skills": ["Java", "Spring Boot"],
+                         "missing_skills": ["Kubernetes"], "analysis": "Strong backend skills, no Kubernetes."},
+        "relevant_experience": {"raw_score": 8, "weighted_score": 20, "analysis": "Six years of backend work."},
+        "education": {"raw_score": 8, "weighted_score": 8, "analysis": "Relevant degree."},
+        "certifications": {"raw_score": 7, "weighted_score": 7, "analysis": "AWS certification."},
+        "cultural_fit": {"raw_score": 7, "weighted_score": 7, "analysis": "Collaborative background."},
+        "language_proficiency": {"raw_score": 10, "weighted_score": 5, "analysis": "Native English."},
+        "achievements_projects": {"raw_score": 6, "weighted_score": 3, "analysis": "Some notable results."}
+    },
+    "red_flags": [],
+    "bonus_points": ["Leadership experience (2 points)"]
+}
+FAKE_ROLE = {"role_type": "Engineering/Technical", "confidence": 0.93,
+             "justification": "Backend engineering role requiring Java and cloud skills."}
+FAKE_INSIGHTS = {"role_specific_insights": [
+    "Strong alignment with the Java/Spring backend stack",
+    "No hands-on Kubernetes experience mentioned",
+    "Led code reviews, indicating technical leadership"
+]}
+
+
+def fake_output_for_prompt(prompt):
+    """Pick the canned model output matching the prompt of a call site."""
+    if "expert resume parser" in prompt:
+        return FAKE_PARSED_RESUME
+    if "job classification" in prompt:
+        return FAKE_ROLE
+    if "Provide 3-5 role-specific insights" in prompt:
+        return FAKE_INSIGHTS
+    return FAKE_MATCH
+
+
+class FakeGeminiConfig:
+    """Behaviour of the fake Gemini server."""
+
+    def __init__(self, latency=1.0, jitter=0.25, error_rate=0.0, rate_limit=0.0, rate_limit_burst=None):
+        """
+        Args:
+            latency: Mean response latency in seconds
+            jitter: Standard deviation of the latency as a fraction of the mean
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit: Sustained requests per second before answering 429 (0 disables)
+            rate_limit_burst: Token bucket size, defaults to one second of rate_limit
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_burst = rate_limit_burst or max(rate_limit, 1.0)
+
+
+class FakeGeminiServer:
+    """
+    Local stand-in for the Gemini REST API.
+
+    Answers POST .../models/<model>:generateContent (and its streaming
+    variant) with a canned JSON document appropriate to the prompt, after a
+    configurable delay. Errors and quota exhaustion (429 RESOURCE_EXHAUSTED)
+    are injected according to the FakeGeminiConfig. Point the service at it
+    with GEMINI_API_ENDPOINT.
+    """
+
+    def __init__(self, config, host='127.0.0.1', port=0):
+        self.config = config
+        self.counters = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+        self._lock = threading.Lock()
+        self._tokens = config.rate_limit_burst
+        self._last_refill = time.monotonic()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def _take_token(self):
+        """Token bucket used to emulate the per-minute quota of the real API."""
+        if not self.config.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.config.rate_limit_burst,
+                               self._tokens + (now - self._last_refill) * self.config.rate_limit)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_error(self, code, status, message):
+                self._send_json(code, {"error": {"code": code, "message": message, "status": status}})
+
+            def do_POST(self):
+                fake._count("requests")
+                length = int(self.headers.get('Content-Length', 0))
+                request_body = json.loads(self.rfile.read(length) or b'{}')
+
+                streaming = ':streamGenerateContent' in self.path
+                if not streaming and ':generateContent' not in self.path:
+                    self._send_error(404, "NOT_FOUND", f"Unknown method {self.path}")
+                    return
+
+                if not fake._take_token():
+                    fake._count("rate_limited")
+                    self._send_error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).")
+                    return
+
+                config = fake.config
+                latency = max(0.0, random.gauss(config.latency, config.latency * config.jitter))
+                # A streamed response starts after a fraction of the latency and spreads the rest over its chunks
+                time.sleep(latency * (0.3 if streaming else 1.0))
+
+                if random.random() < config.error_rate:
+                    fake._count("errors")
+                    self._send_error(500, "INTERNAL", "An internal error has occurred.")
+                    return
+
+                prompt = " ".join(
+                    part.get("text", "")
+                    for content in request_body.get("contents", [])
+                    for part in content.get("parts", [])
+                )
+                text = "```json\n" + json.dumps(fake_output_for_prompt(prompt), indent=2) + "\n```"
+                fake._count("ok")
+                if streaming:
+                    self._send_stream(text, latency * 0.7)
+                else:
+                    self._send_json(200, self._response(text, prompt, "STOP"))
+
+            def _response(self, text, prompt, finish_reason=None):
+                candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+                if finish_reason:
+                    candidate["finishReason"] = finish_reason
+                return {
+                    "candidates": [candidate],
+                    "usageMetadata": {
+                        "promptTokenCount": len(prompt) // 4,
+                        "candidatesTokenCount": len(text) // 4,
+                        "totalTokenCount": (len(prompt) + len(text)) // 4
+                    }
+                }
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_stream(self, text, duration, chunks=4):
+                """Send the REST streaming format: a JSON array of responses, written incrementally."""
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                size = -(-len(text) // chunks)
+                pieces = [text[i:i + size] for i in range(0, len(text), size)]
+                self._write_chunk(b"[")
+                for index, piece in enumerate(pieces):
+                    last = index == len(pieces) - 1
+                    body = json.dumps(self._response(piece, "", "STOP" if last else None))
+                    self._write_chunk((body if index == 0 else "," + body).encode('utf-8'))
+                    if not last:
+                        time.sleep(duration / len(pieces))
+                self._write_chunk(b"]")
+                self._write_chunk(b"")
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Gemini server listening on {self.endpoint}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+FIRST_NAMES = ["Alex", "Maria", "Wei", "Fatima", "John", "Priya", "Lucas", "Amira", "Kenji", "Sofia"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Haddad", "Kowalski", "Patel", "Martin", "Ben Salah", "Tanaka", "Rossi"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Stark Industries", "Wayne Enterprises", "Hooli"]
+TITLES = ["Software Engineer", "Senior Backend Developer", "Data Engineer", "DevOps Engineer", "Full Stack Developer"]
+SKILLS = ["Python", "Java", "Spring Boot", "Docker", "Kubernetes", "AWS", "PostgreSQL", "React", "Angular",
+          "TypeScript", "Kafka", "Terraform", "CI/CD", "Microservices", "REST APIs", "Git", "Linux"]
+DUTIES = [
+    "Designed and implemented REST APIs serving millions of requests per day",
+    "Migrated monolithic services to a microservice architecture on Kubernetes",
+    "Mentored junior developers and led code reviews",
+    "Built CI/CD pipelines that reduced release time from days to hours",
+    "Optimized SQL queries, cutting p95 latency by 60%",
+    "Collaborated with product managers to define technical roadmaps"
+]
+JOB_DESCRIPTION = {
+    "title": "Senior Backend Engineer",
+    "description": "We are looking for a backend engineer to design and scale our matching platform.",
+    "requirements": ["5+ years of backend development", "Java and Spring Boot", "Kubernetes", "AWS",
+                     "Bachelor's degree in Computer Science or related field"],
+    "responsibilities": ["Design microservices", "Own production reliability", "Mentor engineers"],
+    "company_info": {"name": "Example Corp", "industry": "Technology", "values": ["Ownership", "Curiosity"]}
+}
+
+
+def synthetic_resume(rng):
+    """Generate a plain-text resume of realistic size and structure."""
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [name, f"{name.lower().replace(' ', '.')}@example.com | +1 555 {rng.randint(1000, 9999)}", "",
+             "SUMMARY", "Backend-focused engineer with a track record of shipping reliable distributed systems.", "",
+             "EXPERIENCE"]
+    year = 2025
+    for _ in range(rng.randint(2, 5)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(TITLES)} - {rng.choice(COMPANIES)} ({start} - {year})")
+        lines.extend(f"- {duty}" for duty in rng.sample(DUTIES, 3))
+        lines.append("")
+        year = start
+    lines += ["EDUCATION", f"Bachelor of Science in Computer Science, State University ({year - 4} - {year})", "",
+              "SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(6, 12))), "",
+              "CERTIFICATIONS", "AWS Certified Developer - Associate", "",
+              "LANGUAGES", "English (Fluent), French (Intermediate)"]
+    return "\n".join(lines)
+
+
+class PayloadFactory:
+    """Builds request bodies for each endpoint from synthetic or real resumes."""
+
+    def __init__(self, resume_dir=None, seed=7):
+        self.rng = random.Random(seed)
+        self.resumes = []
+        if resume_dir:
+            for name in sorted(os.listdir(resume_dir)):
+                file_type = os.path.splitext(name)[1].lstrip('.').lower()
+                if file_type not in ('pdf', 'docx', 'txt'):
+                    continue
+                with open(os.path.join(resume_dir, name), 'rb') as f:
+                    raw = f.read()
+                content = raw.decode('utf-8', errors='replace') if file_type == 'txt' else base64.b64encode(raw).decode('ascii')
+                self.resumes.append((content, file_type))
+        if not self.resumes:
+            self.resumes = [(synthetic_resume(self.rng), 'txt') for _ in range(50)]
+        self._lock = threading.Lock()
+
+    def build(self, endpoint):
+        with self._lock:
+            resume, resume_type = self.rng.choice(self.resumes)
+        if endpoint == "match":
+            return {"resume": resume, "resume_type": resume_type, "job_description": JOB_DESCRIPTION}
+        if endpoint == "parse-resume":
+            return {"resume": resume, "resume_type": resume_type}
+        return {"job_description": JOB_DESCRIPTION}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class LoadGenerator:
+    """
+    Open-loop load generator.
+
+    Requests are issued on a fixed schedule regardless of how fast the server
+    answers, and latency is measured from the scheduled send time so that
+    queueing on either side is not hidden (no coordinated omission).
+    """
+
+    def __init__(self, base_url, payloads, mix, timeout=120.0, max_in_flight=1024):
+        self.base_url = base_url.rstrip('/')
+        self.payloads = payloads
+        self.mix = mix
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def _send(self, endpoint, scheduled_at):
+        try:
+            response = self._session().post(self.base_url + ENDPOINTS[endpoint],
+                                            json=self.payloads.build(endpoint), timeout=self.timeout)
+        except requests.RequestException:
+            return endpoint, 0, False, time.monotonic() - scheduled_at
+        latency = time.monotonic() - scheduled_at
+
+        fallback = False
+        if response.status_code == 200:
+            try:
+                fallback = is_fallback_response(endpoint, response.json())
+            except ValueError:
+                # 200 with a body that is not JSON
+                fallback = True
+        return endpoint, response.status_code, fallback, latency
+
+    def run_step(self, rps, duration):
+        """
+        Drive the server at a fixed request rate.
+
+        Returns:
+            Dict of per-endpoint and overall statistics for the step
+        """
+        endpoints, weights = zip(*self.mix.items())
+        rng = random.Random(rps)
+        interval = 1.0 / rps
+        total = max(1, int(rps * duration))
+        futures = []
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            started_at = time.monotonic()
+            for i in range(total):
+                scheduled_at = started_at + i * interval
+                delay = scheduled_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(self._send, rng.choices(endpoints, weights)[0], scheduled_at))
+            results = [future.result() for future in futures]
+        elapsed = time.monotonic() - started_at
+
+        return summarize(rps, elapsed, results)
+
+
+def is_fallback_response(endpoint, body):
+    """
+    Whether a 200 response carries the service's fallback result.
+
+    The service answers model errors (e.g. a 500 or 429 from Gemini) with a
+    default result instead of an error status, so these must be counted as
+    failures or injected upstream errors would look like fast successes.
+    """
+    if endpoint == "match":
+        match_result = body.get("match_result") or {}
+        details = match_result.get("details") or {}
+        return "role_type" not in match_result or any(
+            isinstance(criterion, dict) and criterion.get("analysis") == "Error in processing"
+            for criterion in details.values()
+        )
+    if endpoint == "parse-resume":
+        return (body.get("candidate_info") or {}).get("name") == "Parsing Error"
+    if endpoint == "evaluate-role":
+        return body.get("justification") == "Error in processing"
+    return False
+
+
+def summarize(rps, elapsed, results):
+    """
+    Aggregate raw (endpoint, status, fallback, latency) results of one step.
+
+    Only 200 responses with a real (non-fallback) result count as successes.
+    """
+    def stats(rows):
+        latencies = [latency for _, status, fallback, latency in rows if status == 200 and not fallback]
+        ok = len(latencies)
+        status_counts = {}
+        for _, status, fallback, _ in rows:
+            key = f"{status} fallback" if fallback else str(status)
+            status_counts[key] = status_counts.get(key, 0) + 1
+        return {
+            "requests": len(rows),
+            "ok": ok,
+            "fallbacks": sum(1 for _, status, fallback, _ in rows if status == 200 and fallback),
+            "throughput": ok / elapsed if elapsed else 0.0,
+            "error_rate": (len(rows) - ok) / len(rows) if rows else 0.0,
+            "status_counts": dict(sorted(status_counts.items())),
+            "p50": percentile(latencies, 0.50),
+            "p90": percentile(latencies, 0.90),
+            "p99": percentile(latencies, 0.99),
+            "mean_latency": sum(latencies) / ok if ok else 0.0
+        }
+
+    overall = stats(results)
+    all_latencies = [latency for _, _, _, latency in results]
+    overall["offered_rps"] = rps
+    # Little's law: average number of requests in the system during the step
+    overall["concurrency"] = (len(results) / elapsed) * (sum(all_latencies) / len(all_latencies)) if results else 0.0
+    overall["endpoints"] = {
+        endpoint: stats([row for row in results if row[0] == endpoint])
+        for endpoint in sorted({row[0] for row in results})
+    }
+    return overall
+
+
+def find_saturation(steps, threshold):
+    """
+    Find the step where throughput stops keeping up with offered load.
+
+    Returns:
+        The first step whose successful throughput falls below threshold x
+        offered rate, or None if the server kept up at every step
+    """
+    for step in steps:
+        if step["throughput"] < threshold * step["offered_rps"]:
+            return step
+    return None
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_service(workers, threads, gemini_endpoint, startup_timeout=60.0):
+    """
+    Start the service under gunicorn, pointed at the fake Gemini server.
+
+    Returns:
+        Tuple of (process, base url)
+    """
+    port = free_port()
+    env = dict(os.environ, GEMINI_API_ENDPOINT=gemini_endpoint,
+               GOOGLE_API_KEY=os.environ.get('GOOGLE_API_KEY', 'load-test-key'))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+         '-b', f'127.0.0.1:{port}', '--timeout', '300', 'app:app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Service exited during startup with code {process.returncode}")
+        try:
+            if requests.get(base_url + '/health', timeout=1).status_code == 200:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Service did not become healthy in time")
+
+
+def print_report(config_name, steps, saturation):
+    print(f"\n=== {config_name} ===")
+    print(f"{'offered':>8} {'thrpt':>8} {'err%':>6} {'p50':>7} {'p90':>7} {'p99':>7} {'conc':>6}")
+    for step in steps:
+        print(f"{step['offered_rps']:>8.1f} {step['throughput']:>8.2f} {step['error_rate'] * 100:>6.1f} "
+              f"{step['p50']:>7.2f} {step['p90']:>7.2f} {step['p99']:>7.2f} {step['concurrency']:>6.1f}")
+        for endpoint, stats in step["endpoints"].items():
+            print(f"{'':>8} {endpoint:<14} thrpt {stats['throughput']:.2f} err {stats['error_rate'] * 100:.1f}% "
+                  f"p50 {stats['p50']:.2f} p99 {stats['p99']:.2f} status {stats['status_counts']}")
+    if saturation:
+        best = max(steps, key=lambda step: step["throughput"])
+        print(f"Saturated at {saturation['offered_rps']} rps offered; peak throughput "
+              f"{best['throughput']:.2f} req/s at concurrency {best['concurrency']:.1f}")
+    else:
+        print("Did not saturate within the tested rates")
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        endpoint, _, weight = item.partition('=')
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {endpoint}")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+
+def parse_configs(value):
+    configs = []
+    for item in value.split(','):
+        workers, _, threads = item.partition('x')
+        configs.append((int(workers), int(threads or 1)))
+    return configs
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(
+        description="Load-test the service against a local fake Gemini server."
+    )
+    arg_parser.add_argument('--configs', type=parse_configs, default=parse_configs('2x1,2x4,4x8'),
+                            help="Comma-separated gunicorn WORKERSxTHREADS configurations to test")
+    arg_parser.add_argument('--target', help="Test an already running service at this URL instead of starting gunicorn")
+    arg_parser.add_argument('--rps', default='1,2,5,10,20', help="Comma-separated request rates to step through")
+    arg_parser.add_argument('--step-duration', type=float, default=30.0, help="Seconds per rate step")
+    arg_parser.add_argument('--mix', type=parse_mix, default=parse_mix('match=6,parse-resume=3,evaluate-role=1'),
+                            help="Endpoint weights, e.g. match=6,parse-resume=3,evaluate-role=1")
+    arg_parser.add_argument('--resume-dir', help="Directory of real pdf/docx/txt resumes to use as payloads")
+    arg_parser.add_argument('--fake-latency', type=float, default=1.0, help="Mean fake Gemini latency in seconds")
+    arg_parser.add_argument('--fake-jitter', type=float, default=0.25, help="Latency standard deviation as a fraction of the mean")
+    arg_parser.add_argument('--fake-error-rate', type=float, default=0.0, help="Fraction of fake Gemini calls failing with 500")
+    arg_parser.add_argument('--fake-rate-limit', type=float, default=0.0, help="Fake Gemini quota in calls/s before 429 (0 disables)")
+    arg_parser.add_argument('--saturation-threshold', type=float, default=0.9,
+                            help="Throughput/offered ratio below which the service is considered saturated")
+    arg_parser.add_argument('--stop-after-saturation', action='store_true', help="Skip higher rates once saturated")
+    arg_parser.add_argument('--json', help="Write the full report to this JSON file")
+    args = arg_parser.parse_args(argv)
+
+    fake = FakeGeminiServer(FakeGeminiConfig(
+        latency=args.fake_latency, jitter=args.fake_jitter,
+        error_rate=args.fake_error_rate, rate_limit=args.fake_rate_limit
+    )).start()
+    payloads = PayloadFactory(args.resume_dir)
+    rates = [float(rate) for rate in args.rps.split(',')]
+    configs = [None] if args.target else args.configs
+    report = {}
+
+    try:
+        for config in configs:
+            config_name = args.target or f"{config[0]} workers x {config[1]} threads"
+            process = None
+            if config:
+                process, base_url = start_service(config[0], config[1], fake.endpoint)
+            else:
+                base_url = args.target
+
+            try:
+                generator = LoadGenerator(base_url, payloads, args.mix)
+                steps = []
+                for rps in rates:
+                    logger.info(f"{config_name}: driving {rps} rps for {args.step_duration}s")
+                    steps.append(generator.run_step(rps, args.step_duration))
+                    if args.stop_after_saturation and find_saturation(steps[-1:], args.saturation_threshold):
+                        break
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait()
+
+            saturation = find_saturation(steps, args.saturation_threshold)
+            print_report(config_name, steps, saturation)
+            report[config_name] = {"steps": steps, "saturation_rps": saturation["offered_rps"] if saturation else None}
+    finally:
+        fake.stop()
+
+    report["fake_gemini"] = fake.counters
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
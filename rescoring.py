@@ -0,0 +1,423 @@
+import os
+import re
+import copy
+import json
+import time
+import uuid
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from job_matcher import CRITERIA_WEIGHTS, recompute_overall_score
+from skill_extractor import get_skill_extractor
+
+logger = logging.getLogger(__name__)
+
+ALL_CRITERIA = frozenset(CRITERIA_WEIGHTS)
+
+# Keyword rules applied to the text of each changed requirement, in no particular order;
+# an item can affect several criteria (e.g. "5+ years of Java experience")
+_CRITERIA_PATTERNS = {
+    "certifications": re.compile(r"certif|licen[cs]e|accredit", re.I),
+    "education": re.compile(r"degree|bachelor|master|ph\.?d|diploma|education|graduate|\bb\.?sc?\b|\bm\.?sc?\b|mba", re.I),
+    "relevant_experience": re.compile(r"\d+\s*\+?\s*(years?|yrs?)|experience|seniority|senior|junior", re.I),
+    "language_proficiency": re.compile(
+        r"english|french|spanish|german|arabic|chinese|mandarin|japanese|portuguese|italian|"
+        r"fluen|bilingual|native speaker|proficiency in|spoken|written communication", re.I),
+    "cultural_fit": re.compile(r"value|culture|mission|team environment|collaborat|remote-first|diversity", re.I),
+    "achievements_projects": re.compile(r"portfolio|publication|award|open source|github|side project", re.I),
+    "skills_match": re.compile(r"skill|knowledge of|proficien|familiar|hands-on|expertise|stack", re.I)
+}
+
+# Criteria affected by a change under a field whose path contains one of these words,
+# used when the changed text itself is not conclusive
+_PATH_DEFAULTS = (
+    (("salary", "compensation", "benefit", "perk", "job_id", "posted", "deadline", "apply",
+      "application", "contact", "recruiter", "location", "remote", "employment_type"), frozenset()),
+    (("certif", "licen"), frozenset({"certifications"})),
+    (("education", "degree"), frozenset({"education"})),
+    (("language",), frozenset({"language_proficiency"})),
+    (("value", "culture", "mission", "company"), frozenset({"cultural_fit"})),
+    (("responsibilit", "duties"), frozenset({"relevant_experience", "skills_match"})),
+    (("skill", "requirement", "qualification", "stack", "technolog", "tool", "nice_to_have",
+      "preferred", "must_have"), frozenset({"skills_match"})),
+    (("experience", "seniority", "level"), frozenset({"relevant_experience"}))
+)
+# Fields whose change can alter the nature of the role; they trigger a full rescore
+_FULL_RESCORE_PATHS = ("title", "role", "job_title")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+def _units(value, path, out):
+    """Flatten a job description into {path: set of comparable text units}."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _units(item, f"{path}.{key}" if path else str(key), out)
+    elif isinstance(value, list):
+        units = out.setdefault(path, set())
+        for item in value:
+            if isinstance(item, (dict, list)):
+                units.add(json.dumps(item, sort_keys=True))
+            else:
+                units.add(' '.join(str(item).split()))
+    elif isinstance(value, str):
+        units = out.setdefault(path, set())
+        for sentence in _SENTENCE_SPLIT_RE.split(value):
+            sentence = ' '.join(sentence.split())
+            if sentence:
+                units.add(sentence)
+    else:
+        out.setdefault(path, set()).add(json.dumps(value))
+    return out
+
+
+def diff_job_descriptions(old_job, new_job):
+    """
+    Compare two versions of a job description.
+
+    Strings are compared sentence by sentence and lists item by item, so
+    reordering or reformatting does not count as a change.
+
+    Returns:
+        List of (path, text) tuples for every added or removed unit
+    """
+    old_units = _units(old_job, "", {})
+    new_units = _units(new_job, "", {})
+    changes = []
+    for path in sorted(set(old_units) | set(new_units)):
+        before, after = old_units.get(path, set()), new_units.get(path, set())
+        for text in sorted(before ^ after):
+            changes.append((path, text))
+    return changes
+
+
+def classify_change(path, text, skill_extractor=None):
+    """
+    Determine which criteria a single changed unit of a job description affects.
+
+    Returns:
+        frozenset of criterion keys; ALL_CRITERIA when the change is not understood
+    """
+    lowered_path = path.lower()
+    leaf = lowered_path.rsplit('.', 1)[-1]
+    if leaf in _FULL_RESCORE_PATHS:
+        return ALL_CRITERIA
+
+    path_criteria = None
+    for words, criteria in _PATH_DEFAULTS:
+        if any(word in lowered_path for word in words):
+            path_criteria = criteria
+            break
+    if path_criteria is not None and not path_criteria:
+        # Fields that are not part of the evaluation (salary, location, ...)
+        return path_criteria
+
+    criteria = {criterion for criterion, pattern in _CRITERIA_PATTERNS.items() if pattern.search(text)}
+    skill_extractor = skill_extractor or get_skill_extractor()
+    if skill_extractor.find(text):
+        criteria.add("skills_match")
+
+    if criteria:
+        return frozenset(criteria)
+    if path_criteria is not None:
+        return path_criteria
+    return ALL_CRITERIA
+
+
+def has_all_criteria(match_result):
+    """
+    Whether a stored match result has a numeric raw score for every criterion.
+
+    Results trimmed by a "fields" projection (e.g. only score and
+    interpretation) cannot have their overall score re-derived from the
+    criteria that changed.
+    """
+    details = match_result.get("details")
+    if not isinstance(details, dict):
+        return False
+    for criterion in CRITERIA_WEIGHTS:
+        criterion_result = details.get(criterion)
+        if not isinstance(criterion_result, dict):
+            return False
+        raw_score = criterion_result.get("raw_score")
+        if isinstance(raw_score, bool) or not isinstance(raw_score, (int, float)):
+            return False
+    return True
+
+
+def affected_criteria(old_job, new_job, skill_extractor=None):
+    """
+    Determine which criteria need re-evaluation after a job description edit.
+
+    Returns:
+        Tuple of (set of affected criterion keys, list of changes)
+    """
+    changes = diff_job_descriptions(old_job, new_job)
+    affected = set()
+    for path, text in changes:
+        affected |= classify_change(path, text, skill_extractor)
+        if affected >= ALL_CRITERIA:
+            break
+    return affected, changes
+
+
+class JobRescorer:
+    """
+    Re-scores stored match results after a job description is edited.
+
+    Only the criteria affected by the edit are re-evaluated, with a single
+    smaller LLM call per candidate; unaffected criteria, red flags, bonus
+    points and role-specific insights are kept, and the overall score is
+    re-derived from the criterion weights. Edits that change the nature of
+    the role (e.g. the title), and stored results without every criterion
+    score, fall back to a full match and role adaptation.
+
+    With an admission controller, every candidate holds a slot of the given
+    priority class while its model calls run, so re-scoring competes with
+    bulk traffic and never takes the slots reserved for interactive requests.
+    """
+
+    def __init__(self, job_matcher, role_evaluator, workers=16, admission=None):
+        self.job_matcher = job_matcher
+        self.role_evaluator = role_evaluator
+        self.workers = workers
+        self.admission = admission
+
+    @contextmanager
+    def _admitted(self, priority):
+        """Hold an admission slot of the given class, if admission control is configured."""
+        if self.admission is None:
+            yield
+            return
+        ticket = self.admission.acquire(priority)
+        try:
+            yield
+        finally:
+            self.admission.release(ticket)
+
+    def _rescore_one(self, candidate, job_description, criteria, priority='batch'):
+        match_result = copy.deepcopy(candidate["match_result"])
+        try:
+            with self._admitted(priority):
+                updated = self.job_matcher.score_criteria(candidate["parsed_resume"], job_description,
+                                                          sorted(criteria))
+            match_result.setdefault("details", {}).update(updated)
+            # Raises on a non-numeric raw_score, e.g. "8/10" in a stored result
+            recompute_overall_score(match_result)
+        except Exception as e:
+            logger.error(f"Error re-scoring candidate {candidate.get('candidate_id', '')}: {e}")
+            return {"candidate_id": candidate.get("candidate_id"), "match_result": candidate["match_result"],
+                    "error": "Re-scoring failed; previous result kept"}
+
+        return {"candidate_id": candidate.get("candidate_id"), "match_result": match_result}
+
+    def _full_rescore_one(self, candidate, job_description, priority='batch'):
+        try:
+            with self._admitted(priority):
+                match_result = self.job_matcher.calculate_match(candidate["parsed_resume"], job_description)
+                adapted_result = self.role_evaluator.adapt_evaluation(job_description, match_result)
+        except Exception as e:
+            logger.error(f"Error re-matching candidate {candidate.get('candidate_id', '')}: {e}")
+            return {"candidate_id": candidate.get("candidate_id"), "match_result": candidate["match_result"],
+                    "error": "Re-scoring failed; previous result kept"}
+        return {"candidate_id": candidate.get("candidate_id"), "match_result": adapted_result}
+
+    def rescore(self, old_job, new_job, candidates, on_progress=None, priority='batch'):
+        """
+        Re-score candidates after a job description edit.
+
+        Args:
+            old_job: Job description the stored results were computed against
+            new_job: Edited job description
+            candidates: List of {"candidate_id", "parsed_resume", "match_result"} dicts,
+                where match_result is the stored /api/v1/match result
+            on_progress: Optional callback on_progress(completed, total) invoked
+                as candidates finish
+            priority: Admission priority class of the model calls
+
+        Returns:
+            Dict with the affected criteria, whether a full rescore was needed,
+            and the updated results in input order
+        """
+        criteria, changes = affected_criteria(old_job, new_job, self.job_matcher.skill_extractor)
+        full_rescore = criteria >= ALL_CRITERIA
+        logger.info(f"Job edit with {len(changes)} changes affects "
+                    f"{'all criteria' if full_rescore else sorted(criteria) or 'no criteria'}; "
+                    f"re-scoring {len(candidates)} candidates")
+
+        if not criteria:
+            results = [{"candidate_id": candidate.get("candidate_id"), "match_result": candidate["match_result"]}
+                       for candidate in candidates]
+        else:
+            def task(candidate):
+                if full_rescore or not has_all_criteria(candidate["match_result"]):
+                    return self._full_rescore_one(candidate, new_job, priority)
+                return self._rescore_one(candidate, new_job, criteria, priority)
+
+            results = [None] * len(candidates)
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(task, candidate): index for index, candidate in enumerate(candidates)}
+                for completed, future in enumerate(as_completed(futures), start=1):
+                    results[futures[future]] = future.result()
+                    if on_progress:
+                        on_progress(completed, len(candidates))
+
+        return {
+            "affected_criteria": sorted(criteria),
+            "full_rescore": full_rescore,
+            "changes": len(changes),
+            "results": results
+        }
+
+
+class RescoreQueueFull(Exception):
+    """Raised when a re-scoring job cannot be queued because the backlog is full."""
+
+
+class RescoreJobs:
+    """
+    Runs re-scoring requests as background jobs.
+
+    Re-scoring thousands of candidates takes minutes, far beyond an HTTP
+    request timeout, so requests are queued and their state is written to
+    "<directory>/<job_id>.json". Any worker process on the host can then
+    answer status requests for a job started by another worker. Jobs that
+    were running when their process stopped stay "running"; their
+    "updated_at" stops advancing.
+
+    Queued jobs hold their full candidate lists in memory, so the number of
+    queued and running jobs per process is bounded.
+    """
+
+    _JOB_ID_RE = re.compile(r"[0-9a-f]{32}")
+
+    def __init__(self, rescorer, directory=None, max_running=2, max_pending=8, retention=24 * 3600,
+                 progress_interval=2.0):
+        """
+        Args:
+            rescorer: JobRescorer used to run the jobs
+            directory: Directory holding the job state files, shared by all workers
+            max_running: Jobs run concurrently by this process; others wait queued
+            max_pending: Maximum queued and running jobs of this process
+            retention: Seconds after which finished job files are deleted
+            progress_interval: Minimum seconds between progress updates of a job file
+        """
+        self.rescorer = rescorer
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'resume-matcher-rescore')
+        self.retention = retention
+        self.progress_interval = progress_interval
+        self.max_pending = max_pending
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_running)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _write(self, job):
+        """Replace a job's state file atomically so readers never see a partial file."""
+        job["updated_at"] = time.time()
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job, f)
+            os.replace(temp_path, self._path(job["job_id"]))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def _cleanup(self):
+        """Delete job files older than the retention period."""
+        cutoff = time.time() - self.retention
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def submit(self, old_job, new_job, candidates, transform=None, priority='batch'):
+        """
+        Queue a re-scoring job.
+
+        Args:
+            old_job: Job description the stored results were computed against
+            new_job: Edited job description
+            candidates: Candidates as accepted by JobRescorer.rescore
+            transform: Optional function applied to the result before it is
+                stored, e.g. a field projection
+            priority: Admission priority class of the job's model calls
+
+        Returns:
+            The job's initial state
+
+        Raises:
+            RescoreQueueFull: If max_pending jobs are already queued or running
+        """
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise RescoreQueueFull(f"{self._pending} re-scoring jobs are already queued or running")
+            self._pending += 1
+
+        try:
+            self._cleanup()
+            job = {
+                "job_id": uuid.uuid4().hex,
+                "status": "queued",
+                "total": len(candidates),
+                "completed": 0,
+                "created_at": time.time()
+            }
+            self._write(job)
+            self._executor.submit(self._run, dict(job), old_job, new_job, candidates, transform, priority)
+        except Exception:
+            with self._pending_lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job, old_job, new_job, candidates, transform, priority):
+        try:
+            self._run_job(job, old_job, new_job, candidates, transform, priority)
+        finally:
+            with self._pending_lock:
+                self._pending -= 1
+
+    def _run_job(self, job, old_job, new_job, candidates, transform, priority):
+        job["status"] = "running"
+        self._write(job)
+        last_update = [time.monotonic()]
+        progress_lock = threading.Lock()
+
+        def on_progress(completed, total):
+            with progress_lock:
+                job["completed"] = completed
+                now = time.monotonic()
+                if now - last_update[0] >= self.progress_interval:
+                    last_update[0] = now
+                    self._write(job)
+
+        try:
+            result = self.rescorer.rescore(old_job, new_job, candidates, on_progress=on_progress,
+                                           priority=priority)
+            job.update(status="done", completed=len(candidates), result=transform(result) if transform else result)
+        except Exception as e:
+            logger.error(f"Re-scoring job {job['job_id']} failed: {e}", exc_info=True)
+            job.update(status="failed", error="Re-scoring failed")
+        job["finished_at"] = time.time()
+        with progress_lock:
+            self._write(job)
+
+    def get(self, job_id):
+        """Return the state of a job, or None if it is unknown or expired."""
+        if not self._JOB_ID_RE.fullmatch(job_id or ""):
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
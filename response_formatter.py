@@ -1,13 +1,88 @@
+import gzip
 import json
+import time
 import logging
+import threading
+
+try:
+    import orjson
+except ImportError:  # Optional faster encoder
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Responses smaller than this are not worth compressing
+COMPRESSION_MIN_BYTES = 1024
+
+def project(data, fields):
+    """
+    Keep only the requested fields of a result.
+
+    Args:
+        data: Result dict (lists of dicts are projected element-wise)
+        fields: Dotted paths, e.g. ["score", "details.skills_match.matching_skills"]
+
+    Returns:
+        A trimmed copy of data; unknown paths are ignored
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = [part for part in field.strip().split('.') if part]
+        for index, part in enumerate(parts):
+            if index == len(parts) - 1:
+                node[part] = True
+            elif node.get(part) is not True:
+                node = node.setdefault(part, {})
+            else:
+                # A shorter path already selects this whole subtree
+                break
+    return _apply_projection(data, tree) if tree else data
+
+def _apply_projection(value, tree):
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        return [_apply_projection(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _apply_projection(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header value allows a gzip response.
+
+    An explicit gzip entry takes precedence over "*", whatever their order,
+    so "*;q=0.5, gzip;q=0" refuses gzip.
+    """
+    qualities = {}
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if coding not in ('gzip', 'x-gzip', '*'):
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # x-gzip is an alias of gzip (RFC 9110)
+        qualities['gzip' if coding == 'x-gzip' else coding] = quality
+    quality = qualities.get('gzip', qualities.get('*', 0.0))
+    return quality > 0
+
 class ResponseFormatter:
     """
     Utility class to format the API response according to the required template.
     """
     
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+    
     @staticmethod
     def format_response(match_result):
         """
@@ -33,3 +108,67 @@ class ResponseFormatter:
             return {
                 "match_score": 0.0
             }
+
+    @staticmethod
+    def serialize(payload):
+        """Serialize a payload to compact JSON bytes, using orjson when it is installed."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(payload)
+            except TypeError:
+                # e.g. integers beyond 64 bits; fall back to the standard encoder
+                pass
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def encode(self, payload, endpoint, accept_encoding=None):
+        """
+        Serialize and, if the client accepts it, gzip-compress a response body.
+
+        Serialization time and payload sizes are recorded per endpoint.
+
+        Args:
+            payload: JSON-serializable response
+            endpoint: Name under which to record metrics
+            accept_encoding: Value of the client's Accept-Encoding header
+
+        Returns:
+            Tuple of (body bytes, response headers dict)
+        """
+        started = time.perf_counter()
+        body = self.serialize(payload)
+        serialized = time.perf_counter()
+        raw_size = len(body)
+
+        headers = {"Content-Type": "application/json", "Vary": "Accept-Encoding"}
+        if raw_size >= COMPRESSION_MIN_BYTES and accepts_gzip(accept_encoding):
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        finished = time.perf_counter()
+
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                "responses": 0, "serialize_seconds": 0.0, "compress_seconds": 0.0,
+                "raw_bytes": 0, "sent_bytes": 0, "max_raw_bytes": 0
+            })
+            stats["responses"] += 1
+            stats["serialize_seconds"] += serialized - started
+            stats["compress_seconds"] += finished - serialized
+            stats["raw_bytes"] += raw_size
+            stats["sent_bytes"] += len(body)
+            stats["max_raw_bytes"] = max(stats["max_raw_bytes"], raw_size)
+        return body, headers
+
+    def stats(self):
+        """Per-endpoint serialization time and payload size metrics."""
+        with self._lock:
+            result = {"encoder": "orjson" if orjson is not None else "json", "endpoints": {}}
+            for endpoint, stats in self._stats.items():
+                responses = stats["responses"]
+                result["endpoints"][endpoint] = dict(
+                    stats,
+                    mean_serialize_ms=round(stats["serialize_seconds"] / responses * 1000, 3),
+                    mean_compress_ms=round(stats["compress_seconds"] / responses * 1000, 3),
+                    mean_raw_bytes=round(stats["raw_bytes"] / responses),
+                    mean_sent_bytes=round(stats["sent_bytes"] / responses)
+                )
+            return result
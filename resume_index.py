@@ -0,0 +1,443 @@
+import os
+import re
+import queue
+import fcntl
+import pickle
+import random
+import hashlib
+import logging
+import tempfile
+import threading
+from array import array
+from collections import namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used as the modulus of the MinHash permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_SNAPSHOT_VERSION = 2
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+DuplicateMatch = namedtuple('DuplicateMatch', ['entry_id', 'similarity', 'payload'])
+
+
+class NearDuplicateIndex:
+    """
+    In-process MinHash/LSH index over extracted resume text.
+
+    Resumes re-exported from a different editor produce different bytes but
+    nearly identical text. Each document is reduced to a MinHash signature of
+    its word shingles; signatures are split into bands and bucketed so that a
+    lookup only compares against documents sharing at least one band, which
+    keeps lookups independent of the index size. Every entry carries an
+    arbitrary payload (e.g. the parsed resume and cached match results).
+
+    Persistence uses a snapshot plus an append-only journal next to it
+    ("<snapshot_path>.journal"). Every modification is appended to the
+    journal by a background writer thread, so requests never wait for disk
+    I/O, and the journal is periodically compacted into a new snapshot.
+    Several processes (e.g. gunicorn workers) may share one snapshot path:
+    entry ids are random, journal appends and compactions are serialized
+    with a file lock, and a compaction replays the other processes' journal
+    records first, so no process overwrites entries written by another.
+    Each process only sees the other processes' entries after a restart.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=64, bands=8, shingle_size=3,
+                 snapshot_path=None, compact_every=10000, seed=1):
+        """
+        Initialize the index, loading an existing snapshot and journal if present.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity to report a duplicate
+            num_perm: Number of MinHash permutations per signature
+            bands: Number of LSH bands; must divide num_perm
+            shingle_size: Number of words per shingle
+            snapshot_path: Optional file used to persist the index
+            compact_every: Compact the journal into a new snapshot after this
+                many journal records written by this process (0 disables)
+            seed: Seed for the permutation coefficients; must be stable across runs
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + '.journal' if snapshot_path else None
+        self.compact_every = compact_every
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        # Entry ids must not collide between processes sharing a snapshot
+        self._id_random = random.SystemRandom()
+        # Tags the journal records of this instance, which are already applied in memory
+        self._origin = self._id_random.getrandbits(64)
+
+        # Payloads are copied on write, never mutated in place, so a shallow
+        # copy of these dicts taken under the lock is a consistent snapshot
+        self._signatures = {}   # entry_id -> array('I') signature
+        self._payloads = {}     # entry_id -> payload
+        # One dict per band: band hash -> entry_id, or list of entry_ids on collision
+        self._buckets = [{} for _ in range(bands)]
+        self._lock = threading.RLock()
+
+        self._save_lock = threading.Lock()
+        self._journal_queue = queue.Queue()
+        self._journal_thread = None
+        self._journal_thread_lock = threading.Lock()
+        self._journal_inode = None    # inode of the journal this process has read
+        self._journal_offset = 0      # bytes of that journal already applied
+        self._journal_records = 0     # records appended since the last compaction
+        self._journal_end = (None, 0) # (inode, offset) up to which the journal is known to be intact
+
+        if snapshot_path:
+            self._open_snapshot()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def _shingles(self, text):
+        """Hash the word shingles of normalized text into 32-bit integers."""
+        tokens = _TOKEN_RE.findall(text.lower())
+        if len(tokens) < self.shingle_size:
+            tokens = tokens + [''] * (self.shingle_size - len(tokens))
+        shingles = set()
+        for i in range(len(tokens) - self.shingle_size + 1):
+            shingle = ' '.join(tokens[i:i + self.shingle_size]).encode('utf-8')
+            shingles.add(int.from_bytes(hashlib.blake2b(shingle, digest_size=4).digest(), 'little'))
+        return shingles
+
+    def signature(self, text):
+        """
+        Compute the MinHash signature of a text.
+
+        Returns:
+            array('I') of num_perm minimum hash values
+        """
+        shingles = self._shingles(text)
+        signature = array('I')
+        for a, b in self._perms:
+            signature.append(min(((a * x + b) % _MERSENNE_PRIME) & _MAX_HASH for x in shingles))
+        return signature
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        # Band keys are recomputed by other processes, so use a hash that is stable across processes
+        return [
+            int.from_bytes(hashlib.blake2b(signature[i * rows:(i + 1) * rows].tobytes(), digest_size=8).digest(), 'little')
+            for i in range(self.bands)
+        ]
+
+    @staticmethod
+    def similarity(signature_a, signature_b):
+        """Estimated Jaccard similarity of two signatures."""
+        same = sum(1 for x, y in zip(signature_a, signature_b) if x == y)
+        return same / len(signature_a)
+
+    def lookup(self, text=None, signature=None):
+        """
+        Find the most similar indexed document above the threshold.
+
+        Args:
+            text: Document text (ignored if signature is given)
+            signature: Precomputed signature of the document
+
+        Returns:
+            DuplicateMatch or None
+        """
+        if signature is None:
+            signature = self.signature(text)
+
+        best = None
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket is None:
+                    continue
+                if isinstance(bucket, list):
+                    candidates.update(bucket)
+                else:
+                    candidates.add(bucket)
+
+            for entry_id in candidates:
+                score = self.similarity(signature, self._signatures[entry_id])
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (entry_id, score)
+
+            if best is None:
+                return None
+            return DuplicateMatch(best[0], best[1], self._payloads[best[0]])
+
+    def _insert(self, entry_id, signature, payload):
+        """Add an entry to the in-memory structures; the caller holds the lock."""
+        self._signatures[entry_id] = signature
+        self._payloads[entry_id] = payload
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is None:
+                self._buckets[band][key] = entry_id
+            elif isinstance(bucket, list):
+                bucket.append(entry_id)
+            else:
+                self._buckets[band][key] = [bucket, entry_id]
+
+    def add(self, text=None, payload=None, signature=None):
+        """
+        Add a document to the index.
+
+        Args:
+            text: Document text (ignored if signature is given)
+            payload: Arbitrary picklable data associated with the document
+            signature: Precomputed signature of the document
+
+        Returns:
+            The new entry id
+        """
+        if signature is None:
+            signature = self.signature(text)
+        payload = payload if payload is not None else {}
+
+        with self._lock:
+            entry_id = self._id_random.getrandbits(63)
+            while entry_id in self._signatures:
+                entry_id = self._id_random.getrandbits(63)
+            self._insert(entry_id, signature, payload)
+        self._append("add", entry_id, signature, payload)
+        return entry_id
+
+    def get_payload(self, entry_id):
+        """Return the payload stored for an entry."""
+        with self._lock:
+            return self._payloads[entry_id]
+
+    def update_payload(self, entry_id, key, value):
+        """Set one key of an entry's payload dict."""
+        with self._lock:
+            self._payloads[entry_id] = dict(self._payloads[entry_id], **{key: value})
+        self._append("update", entry_id, key, value)
+
+    def _apply(self, record):
+        """Apply one journal record written by another instance."""
+        origin, operation, entry_id, *args = record
+        if origin == self._origin:
+            return
+        with self._lock:
+            if operation == "add":
+                if entry_id not in self._signatures:
+                    self._insert(entry_id, *args)
+            elif operation == "update" and entry_id in self._payloads:
+                key, value = args
+                self._payloads[entry_id] = dict(self._payloads[entry_id], **{key: value})
+
+    def _append(self, operation, entry_id, *args):
+        """Queue a modification for the journal writer thread."""
+        if not self.journal_path:
+            return
+        data = pickle.dumps((self._origin, operation, entry_id) + args, protocol=pickle.HIGHEST_PROTOCOL)
+        self._journal_queue.put(data)
+        with self._journal_thread_lock:
+            if self._journal_thread is None:
+                self._journal_thread = threading.Thread(target=self._write_journal, daemon=True)
+                self._journal_thread.start()
+
+    def _write_journal(self):
+        while True:
+            data = self._journal_queue.get()
+            try:
+                with self._locked_journal() as (journal, inode):
+                    self._check_journal_tail(journal, inode)
+                    journal.write(data)
+                    journal.flush()
+                    self._journal_end = (inode, journal.tell())
+                self._journal_records += 1
+                if self.compact_every and self._journal_records >= self.compact_every:
+                    self.compact()
+            except Exception as e:
+                logger.error(f"Error writing near-duplicate index journal: {e}")
+            finally:
+                self._journal_queue.task_done()
+
+    def flush(self):
+        """Block until every queued modification has been written to the journal."""
+        if self._journal_thread is not None:
+            self._journal_queue.join()
+
+    @contextmanager
+    def _locked_journal(self):
+        """
+        Open the journal file under an exclusive flock shared by all processes.
+
+        A compaction replaces the journal file, so the file is reopened if it
+        was replaced while waiting for the lock.
+
+        Yields:
+            Tuple of (file opened for appending and reading, its inode)
+        """
+        while True:
+            journal = open(self.journal_path, 'a+b')
+            try:
+                fcntl.flock(journal, fcntl.LOCK_EX)
+                inode = os.fstat(journal.fileno()).st_ino
+                if os.path.exists(self.journal_path) and os.stat(self.journal_path).st_ino == inode:
+                    yield journal, inode
+                    return
+            finally:
+                journal.close()
+
+    def _check_journal_tail(self, journal, inode):
+        """
+        Make sure the journal does not end in a partial record before appending to it.
+
+        Records appended by other processes since the last check are parsed
+        (not applied) up to the end of the file.
+        """
+        known_inode, offset = self._journal_end
+        if known_inode != inode:
+            offset = 0
+        journal.seek(offset)
+        while True:
+            try:
+                pickle.load(journal)
+            except Exception:
+                break
+            offset = journal.tell()
+        self._truncate_tail(journal, offset)
+        self._journal_end = (inode, offset)
+
+    def _truncate_tail(self, journal, offset):
+        """Cut off anything after the last intact record, e.g. a record left half-written by a crash."""
+        if os.fstat(journal.fileno()).st_size > offset:
+            # Appends are serialized by the file lock, so a partial record can only be left by a dead writer
+            logger.warning(f"Dropping corrupt tail of {self.journal_path}")
+            journal.truncate(offset)
+
+    def _replay_journal(self, journal, inode):
+        """Apply journal records not read yet; returns False if the journal was replaced by a compaction."""
+        if inode != self._journal_inode:
+            if self._journal_inode is not None:
+                return False
+            self._journal_inode, self._journal_offset = inode, 0
+
+        journal.seek(self._journal_offset)
+        while True:
+            try:
+                record = pickle.load(journal)
+            except Exception:
+                break
+            self._apply(record)
+            self._journal_offset = journal.tell()
+        self._truncate_tail(journal, self._journal_offset)
+        return True
+
+    def _snapshot_state(self):
+        """Consistent shallow copy of the index, taken without holding the lock during serialization."""
+        with self._lock:
+            return {
+                "version": _SNAPSHOT_VERSION,
+                "params": (self.num_perm, self.bands, self.shingle_size, self._perms),
+                "signatures": dict(self._signatures),
+                "payloads": dict(self._payloads)
+            }
+
+    @staticmethod
+    def _write_atomically(path, state=None):
+        """
+        Write a snapshot (or an empty file) via a temporary file and rename, so
+        a crash never leaves it half-written.
+
+        The state is pickled straight to the file rather than with dumps(),
+        which would hold the GIL, and so stall lookups, for the whole
+        serialization of a large index.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if state is not None:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def save(self, path):
+        """
+        Write a full snapshot of this process's index to a separate file, e.g. for a backup.
+
+        The configured snapshot is maintained through the journal; see compact().
+        """
+        with self._save_lock:
+            state = self._snapshot_state()
+            self._write_atomically(path, state)
+        logger.info(f"Saved near-duplicate index snapshot with {len(state['signatures'])} entries to {path}")
+
+    def compact(self):
+        """
+        Fold the journal into a new snapshot and start an empty journal.
+
+        Journal records of other processes are applied first so that the new
+        snapshot contains every entry. Skipped if another process compacted
+        since this one last read the journal, since the entries written in
+        between are then only in that process's snapshot.
+
+        Returns:
+            True if a new snapshot was written
+        """
+        if not self.snapshot_path:
+            raise ValueError("No snapshot path configured")
+
+        with self._save_lock, self._locked_journal() as (journal, inode):
+            self._journal_records = 0
+            if not self._replay_journal(journal, inode):
+                logger.info("Near-duplicate index was compacted by another process; skipping")
+                return False
+
+            state = self._snapshot_state()
+            self._write_atomically(self.snapshot_path, state)
+            self._write_atomically(self.journal_path)
+            self._journal_inode, self._journal_offset = os.stat(self.journal_path).st_ino, 0
+        logger.info(f"Compacted near-duplicate index snapshot with {len(state['signatures'])} entries "
+                    f"to {self.snapshot_path}")
+        return True
+
+    def _open_snapshot(self):
+        """Load the configured snapshot and replay its journal, holding the journal lock."""
+        with self._locked_journal() as (journal, inode):
+            if os.path.exists(self.snapshot_path):
+                self.load(self.snapshot_path)
+            self._journal_inode = None
+            self._replay_journal(journal, inode)
+        logger.info(f"Opened near-duplicate index with {len(self._signatures)} entries from {self.snapshot_path}")
+
+    def load(self, path):
+        """Load a snapshot previously written by save() or compact(), replacing the index contents."""
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+
+        if data.get("version") != _SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version: {data.get('version')}")
+        num_perm, bands, shingle_size, perms = data["params"]
+        if (num_perm, bands, shingle_size) != (self.num_perm, self.bands, self.shingle_size):
+            raise ValueError("Snapshot was built with different index parameters")
+
+        with self._lock:
+            self._perms = perms
+            self._signatures = {}
+            self._payloads = {}
+            self._buckets = [{} for _ in range(self.bands)]
+            # Buckets are derived from the signatures rather than stored
+            for entry_id, signature in data["signatures"].items():
+                self._insert(entry_id, signature, data["payloads"][entry_id])
+        logger.info(f"Loaded near-duplicate index snapshot with {len(self._signatures)} entries from {path}")
+
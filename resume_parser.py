@@ -1,13 +1,17 @@
 import os
-import base64
 import json
+import base64
 import logging
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import google.generativeai as genai
 from PyPDF2 import PdfReader
 import docx2txt
 from dotenv import load_dotenv
+from skill_extractor import get_skill_extractor, normalize_term
+from llm_json import StreamingJSONDecoder, generate_json
+from resume_sections import split_sections, split_long_section
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,10 +26,62 @@ try:
     if not GOOGLE_API_KEY:
         logger.warning("GOOGLE_API_KEY environment variable not set")
 
-    genai.configure(api_key=GOOGLE_API_KEY)
+    # Optional alternative endpoint, e.g. the fake Gemini server used by load_harness.py
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GOOGLE_API_KEY, transport='rest',
+                        client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GOOGLE_API_KEY)
 except Exception as e:
     logger.error(f"Error initializing Gemini API: {e}")
 
+# Resumes longer than this many characters are parsed section by section (0 disables)
+CHUNKED_PARSE_THRESHOLD = int(os.getenv('RESUME_CHUNK_THRESHOLD', 12000))
+# Sections longer than this are split further so no single prompt dominates latency
+CHUNK_MAX_CHARS = int(os.getenv('RESUME_CHUNK_MAX_CHARS', 6000))
+CHUNK_WORKERS = int(os.getenv('RESUME_CHUNK_WORKERS', 6))
+
+# Output schema of each top-level key, used to build the per-section prompts
+SECTION_SCHEMAS = {
+    "candidate_info": {
+        "name": "", "email": "", "phone": "",
+        "location": {"city": "", "state": "", "country": ""},
+        "linkedin": "", "website": ""
+    },
+    "skills": {"technical": [], "soft": []},
+    "experience": [{
+        "company": "", "title": "", "location": "", "start_date": "", "end_date": "",
+        "responsibilities": [], "achievements": []
+    }],
+    "education": [{
+        "degree": "", "field_of_study": "", "institution": "", "location": "", "start_date": "", "end_date": ""
+    }],
+    "certifications": [{"name": "", "issuer": "", "date": "", "expires": ""}],
+    "languages": [{"language": "", "proficiency": ""}],
+    "projects": [{"name": "", "description": "", "technologies": [], "url": ""}]
+}
+
+# Output keys extracted from each kind of section found by split_sections
+SECTION_TARGETS = {
+    "contact": ("candidate_info",),
+    "summary": ("candidate_info", "skills"),
+    "experience": ("experience",),
+    "education": ("education",),
+    "skills": ("skills", "languages"),
+    "certifications": ("certifications",),
+    "languages": ("languages",),
+    "projects": ("projects",),
+    "publications": ("projects",)
+}
+# Sections that only hold contact details and a summary; a chunked parse is
+# only worthwhile when most of the text lies in the other sections
+_PREAMBLE_SECTIONS = frozenset(("contact", "summary"))
+SECTION_HINTS = {
+    "experience": "If the text continues a role whose company and title lines are repeated at the top, report it as one entry with that company and title.",
+    "publications": "List each publication as a project, with its title as the name and the venue and year as the description."
+}
+
 
 class ResumeParser:
     def __init__(self):
@@ -33,6 +89,8 @@ class ResumeParser:
         try:
             # Use Gemini Pro model for text processing
             self.model = genai.GenerativeModel('gemini-1.5-flash')
+            # Local taxonomy used for the fast parse mode and skill normalization
+            self.skill_extractor = get_skill_extractor()
         except Exception as e:
             logger.error(f"Failed to initialize Gemini model: {e}")
             raise
@@ -86,25 +144,111 @@ class ResumeParser:
             logger.error(f"Error extracting text from {file_type} file: {e}")
             raise
 
-    def parse(self, resume_content, resume_type='txt'):
+    def get_resume_text(self, resume_content, resume_type='txt'):
+        """
+        Get the plain text of a resume, extracting it from the file if needed.
+
+        Args:
+            resume_content: Base64 encoded file or plain text
+            resume_type: File type (pdf, docx, txt)
+
+        Returns:
+            Plain resume text
+        """
+        # Extract text if not already plain text
+        if resume_type != 'txt' or (
+                resume_type == 'txt' and resume_content.startswith("data:") or resume_content.startswith("JVBERi")):
+            return self.extract_text_from_file(resume_content, resume_type)
+        return resume_content
+
+    def parse(self, resume_content, resume_type='txt', mode='full'):
         """
         Parse resume content using Gemini API.
 
         Args:
             resume_content: Base64 encoded file or plain text
             resume_type: File type (pdf, docx, txt)
+            mode: "full" for a complete Gemini parse, or "fast" to only fill
+                the skills locally from the skill taxonomy
 
         Returns:
             Structured resume data
         """
         try:
-            # Extract text if not already plain text
-            if resume_type != 'txt' or (
-                    resume_type == 'txt' and resume_content.startswith("data:") or resume_content.startswith("JVBERi")):
-                resume_text = self.extract_text_from_file(resume_content, resume_type)
-            else:
-                resume_text = resume_content
+            resume_text = self.get_resume_text(resume_content, resume_type)
+        except Exception as e:
+            logger.error(f"Error parsing resume: {e}")
+            return self.empty_result()
 
+        if mode == 'fast':
+            return self.parse_fast(resume_text)
+        return self.parse_text(resume_text)
+
+    def parse_fast(self, resume_text):
+        """
+        Extract skills from plain resume text without calling the LLM.
+
+        Only the "skills" section of the output schema is filled; all other
+        sections are left empty.
+
+        Args:
+            resume_text: Plain resume text
+
+        Returns:
+            Structured resume data
+        """
+        extracted = self.skill_extractor.extract(resume_text)
+        return {
+            "candidate_info": {"name": "", "email": ""},
+            "skills": {
+                "technical": extracted.get("technical", []),
+                "soft": extracted.get("soft", [])
+            },
+            "experience": [],
+            "education": [],
+            "certifications": [],
+            "languages": [],
+            "projects": []
+        }
+
+    def normalize_skills(self, parsed_data):
+        """Canonicalize the skills of a parsed resume against the skill taxonomy, in place."""
+        skills = parsed_data.get("skills")
+        if isinstance(skills, dict):
+            for category in ("technical", "soft"):
+                if isinstance(skills.get(category), list):
+                    skills[category] = self.skill_extractor.normalize_skills(skills[category])
+        return parsed_data
+
+    @staticmethod
+    def empty_result():
+        """Minimal resume structure returned when parsing fails."""
+        return {
+            "candidate_info": {"name": "Parsing Error", "email": ""},
+            "skills": {"technical": [], "soft": []},
+            "experience": [],
+            "education": [],
+            "certifications": [],
+            "languages": [],
+            "projects": []
+        }
+
+    def parse_text(self, resume_text):
+        """
+        Parse plain resume text using Gemini API.
+
+        Args:
+            resume_text: Plain resume text
+
+        Returns:
+            Structured resume data
+        """
+        if CHUNKED_PARSE_THRESHOLD and len(resume_text) > CHUNKED_PARSE_THRESHOLD:
+            parsed_data = self.parse_chunked(resume_text)
+            if parsed_data is not None:
+                return parsed_data
+
+        try:
             # Define the prompt for Gemini
             prompt = f"""
             You are an expert resume parser. Analyze the following resume and extract structured information.
@@ -189,32 +333,158 @@ class ResumeParser:
             Return ONLY the JSON without any additional text or explanations.
             """
 
-            # Generate response from Gemini
-            response = self.model.generate_content(prompt)
-
-            # Extract JSON from response
-            result_text = response.text
-            # Clean up the response if needed to ensure valid JSON
-            result_text = result_text.strip()
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
+            # Generate response from Gemini and decode the JSON as it streams in
+            decoder = StreamingJSONDecoder()
+            parsed_data = generate_json(self.model, prompt, decoder=decoder)
 
-            # Parse JSON
-            parsed_data = json.loads(result_text)
-            return parsed_data
+            # Fill sections missing from a truncated response
+            for key, value in self.empty_result().items():
+                parsed_data.setdefault(key, value)
+            if decoder.repaired:
+                # Keeps the result out of the near-duplicate index
+                parsed_data["repaired"] = True
+            return self.normalize_skills(parsed_data)
 
         except Exception as e:
             logger.error(f"Error parsing resume: {e}")
             # Return a minimal structure if parsing fails
-            return {
-                "candidate_info": {"name": "Parsing Error", "email": ""},
-                "skills": {"technical": [], "soft": []},
-                "experience": [],
-                "education": [],
-                "certifications": [],
-                "languages": [],
-                "projects": []
-            }
\ No newline at end of file
+            return self.empty_result()
+
+    def _parse_section(self, section, keys, section_text):
+        """
+        Parse one section of a long resume with a prompt limited to the relevant keys.
+
+        Returns:
+            Tuple of (dict with the requested keys, whether the model output
+            had to be repaired), or (None, True) if the call failed
+        """
+        schema = json.dumps({key: SECTION_SCHEMAS[key] for key in keys}, indent=4)
+        prompt = f"""
+            You are an expert resume parser. The following text is the "{section}" section of a longer resume.
+
+            Resume section:
+            ```
+            {section_text}
+            ```
+
+            Extract only the information present in this section, in the following JSON format:
+            {schema}
+
+            {SECTION_HINTS.get(section, "")}
+            Return ONLY the JSON without any additional text or explanations.
+            """
+        try:
+            decoder = StreamingJSONDecoder()
+            section_data = generate_json(self.model, prompt, decoder=decoder)
+            return {key: section_data[key] for key in keys if key in section_data}, decoder.repaired
+        except Exception as e:
+            logger.error(f"Error parsing resume section {section}: {e}")
+            return None, True
+
+    @staticmethod
+    def _merge_experience(entries, entry):
+        """
+        Add an experience entry, merging it into an earlier entry for the same role.
+
+        A role split across chunks comes back once per chunk with the same
+        company, title and start date; their lists are combined.
+        """
+        if not isinstance(entry, dict):
+            return
+        role_key = tuple(normalize_term(str(entry.get(field) or "")) for field in ("company", "title", "start_date"))
+        if role_key[0] or role_key[1]:
+            for existing in entries:
+                if isinstance(existing, dict) and role_key == tuple(
+                        normalize_term(str(existing.get(field) or "")) for field in ("company", "title", "start_date")):
+                    for field, value in entry.items():
+                        if isinstance(value, list) and isinstance(existing.get(field), list):
+                            existing[field].extend(item for item in value if item not in existing[field])
+                        elif value and not existing.get(field):
+                            existing[field] = value
+                    return
+        if entry not in entries:
+            entries.append(entry)
+
+    def parse_chunked(self, resume_text):
+        """
+        Parse a long resume section by section with parallel Gemini calls.
+
+        The text is split into sections (and long sections into chunks) with
+        local heuristics; each chunk is parsed with a smaller prompt and the
+        results are merged into the regular output schema. A failed chunk only
+        loses that chunk instead of the whole document; the result is then
+        marked "repaired" so that it is not cached as a complete parse.
+
+        Headings the heuristics do not know (e.g. "Professional Background")
+        leave their text in the preceding section, which would only be asked
+        for that section's keys. If most of the text ends up in the contact or
+        summary section, or in sections without output keys, None is returned
+        so that the caller parses the whole document in one prompt instead.
+
+        Args:
+            resume_text: Plain resume text
+
+        Returns:
+            Structured resume data, or None if the text has too few recognizable sections
+        """
+        chunks = []
+        sectioned_chars = total_chars = 0
+        for section, section_text in split_sections(resume_text):
+            total_chars += len(section_text)
+            keys = SECTION_TARGETS.get(section)
+            if keys:
+                if section not in _PREAMBLE_SECTIONS:
+                    sectioned_chars += len(section_text)
+                for chunk in split_long_section(section_text, CHUNK_MAX_CHARS):
+                    chunks.append((section, keys, chunk))
+        if len(chunks) < 2:
+            return None
+        if sectioned_chars * 2 < total_chars:
+            logger.info(f"Only {sectioned_chars} of {total_chars} resume characters are under known "
+                        f"section headings; parsing the whole resume at once")
+            return None
+
+        logger.info(f"Parsing long resume ({len(resume_text)} chars) as {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=min(CHUNK_WORKERS, len(chunks))) as executor:
+            results = list(executor.map(lambda chunk: self._parse_section(*chunk), chunks))
+
+        if all(result is None for result, _ in results):
+            return self.empty_result()
+
+        merged = {
+            "candidate_info": {},
+            "skills": {"technical": [], "soft": []},
+            "experience": [],
+            "education": [],
+            "certifications": [],
+            "languages": [],
+            "projects": []
+        }
+        for result, _ in results:
+            for key, value in (result or {}).items():
+                if key == "candidate_info" and isinstance(value, dict):
+                    # Keep the first non-empty value of each contact field
+                    for field, field_value in value.items():
+                        if field_value and not merged["candidate_info"].get(field):
+                            merged["candidate_info"][field] = field_value
+                elif key == "skills" and isinstance(value, dict):
+                    for category in ("technical", "soft"):
+                        merged["skills"][category].extend(value.get(category) or [])
+                elif key == "experience" and isinstance(value, list):
+                    for entry in value:
+                        self._merge_experience(merged["experience"], entry)
+                elif isinstance(value, list):
+                    merged[key].extend(item for item in value if item not in merged[key])
+
+        merged["candidate_info"].setdefault("name", "")
+        merged["candidate_info"].setdefault("email", "")
+        if not merged["skills"]["technical"] and not merged["skills"]["soft"]:
+            # No skills section: fall back to the local taxonomy over the whole text
+            extracted = self.skill_extractor.extract(resume_text)
+            merged["skills"] = {"technical": extracted.get("technical", []), "soft": extracted.get("soft", [])}
+        if any(repaired for _, repaired in results):
+            # Some chunks failed or were cut off; keeps the result out of the near-duplicate index
+            logger.warning(f"{sum(repaired for _, repaired in results)} of {len(results)} resume chunks "
+                           f"failed or were repaired")
+            merged["repaired"] = True
+        return self.normalize_skills(merged)
@@ -0,0 +1,142 @@
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Heading keywords for each canonical section, matched against short standalone lines
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "professional summary", "about me", "objective", "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience",
+                   "professional background", "career background", "work background", "positions held"),
+    "education": ("education", "academic background", "academic history", "education and training",
+                  "qualifications", "academic qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "key skills",
+               "skills and tools", "technologies", "tools", "expertise", "areas of expertise"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications",
+                       "certifications and licenses", "professional certifications", "accreditations"),
+    "languages": ("languages", "language skills", "language proficiency"),
+    "projects": ("projects", "personal projects", "selected projects", "key projects", "portfolio"),
+    "publications": ("publications", "selected publications", "papers", "research", "patents",
+                     "conference presentations", "presentations")
+}
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_CLEAN_RE = re.compile(r"[^a-z& ]+")
+_MAX_HEADING_LENGTH = 50
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022\u00b7\u25aa\u2023\u25e6\u2013]|\d+[.)])\s+")
+# An entry's header (company, title, dates) is at most this many lines before its first bullet
+_MAX_HEADER_LINES = 3
+
+
+def heading_section(line):
+    """
+    Return the canonical section a line introduces, or None if it is not a heading.
+
+    A heading is a short standalone line (optionally decorated with colons,
+    bullets or underlines) whose words match a known section title.
+    """
+    stripped = line.strip()
+    if not stripped or len(stripped) > _MAX_HEADING_LENGTH:
+        return None
+    words = _HEADING_CLEAN_RE.sub(' ', stripped.lower()).replace('&', ' and ')
+    return _HEADING_LOOKUP.get(' '.join(words.split()))
+
+
+def split_sections(text):
+    """
+    Split resume text into sections using local heading heuristics.
+
+    Text before the first heading (name, contact details) is returned as
+    the "contact" section. Repeated headings (e.g. two experience blocks)
+    are kept as separate sections in document order.
+
+    Returns:
+        List of (section name, section text) tuples
+    """
+    sections = []
+    current_name, current_lines = "contact", []
+    for line in text.splitlines():
+        section = heading_section(line)
+        if section:
+            if any(existing.strip() for existing in current_lines):
+                sections.append((current_name, "\n".join(current_lines).strip()))
+            current_name, current_lines = section, [line]
+        else:
+            current_lines.append(line)
+    if any(existing.strip() for existing in current_lines):
+        sections.append((current_name, "\n".join(current_lines).strip()))
+    return sections
+
+
+def _entry_header(lines):
+    """Leading lines of an entry (e.g. company, title and dates of a role) before its first bullet."""
+    if lines and heading_section(lines[0]):
+        lines = lines[1:]
+    header = []
+    for line in lines:
+        if _BULLET_RE.match(line) or len(header) >= _MAX_HEADER_LINES:
+            break
+        header.append(line)
+    return header
+
+
+def _split_entry(block, max_chars):
+    """
+    Split one oversized entry line by line.
+
+    The entry's header is repeated at the top of every continuation chunk,
+    so that each chunk can still be attributed to its role.
+    """
+    lines = block.splitlines()
+    header = _entry_header(lines)
+    header_text = "\n".join(header)
+    if len(header) == len(lines) or len(header_text) > max_chars // 2:
+        header, header_text = [], ""
+
+    pieces, current, size = [], [], 0
+    for line in lines:
+        if current and size + len(line) > max_chars:
+            pieces.append("\n".join(current))
+            current = [header_text] if header_text else []
+            size = len(header_text)
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_long_section(text, max_chars):
+    """
+    Split a section into chunks of at most roughly max_chars.
+
+    Splits happen on blank lines first (between roles or publications).
+    An entry that is too long by itself is split between lines, repeating
+    its header lines in each continuation chunk, so entries are never cut
+    in the middle of a line or separated from their company and title.
+
+    Returns:
+        List of chunk texts
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    for block in re.split(r"\n\s*\n", text):
+        if not block.strip():
+            continue
+        if len(block) > max_chars:
+            pieces.extend(_split_entry(block, max_chars))
+        else:
+            pieces.append(block)
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
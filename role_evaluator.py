@@ -3,6 +3,7 @@ import json
 import logging
 import google.generativeai as genai
 from dotenv import load_dotenv
+from llm_json import generate_json
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,7 +18,13 @@ try:
     if not GOOGLE_API_KEY:
         logger.warning("GOOGLE_API_KEY environment variable not set")
     
-    genai.configure(api_key=GOOGLE_API_KEY)
+    # Optional alternative endpoint, e.g. the fake Gemini server used by load_harness.py
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+    if GEMINI_API_ENDPOINT:
+        genai.configure(api_key=GOOGLE_API_KEY, transport='rest',
+                        client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+    else:
+        genai.configure(api_key=GOOGLE_API_KEY)
 except Exception as e:
     logger.error(f"Error initializing Gemini API: {e}")
 
@@ -77,17 +84,11 @@ class RoleEvaluator:
             }}
             """
             
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Extract and clean JSON
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            role_data = json.loads(result_text)
+            role_data = generate_json(self.model, prompt)
+            if "role_type" not in role_data:
+                raise ValueError("Model output is missing role_type")
+            role_data.setdefault("confidence", 0.5)
+            role_data.setdefault("justification", "")
             return role_data
             
         except Exception as e:
@@ -236,17 +237,7 @@ class RoleEvaluator:
             }}
             """
             
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-            
-            # Extract and clean JSON
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
-            
-            insights_data = json.loads(result_text)
+            insights_data = generate_json(self.model, prompt)
             adapted_evaluation["role_specific_insights"] = insights_data.get("role_specific_insights", [])
             
             return adapted_evaluation
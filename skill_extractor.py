@@ -0,0 +1,247 @@
+import os
+import re
+import json
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skill_taxonomy.json')
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+# Punctuation that separates the items of a skills list
+_LIST_SEPARATORS = frozenset(',;:|()[]&*\u2022\u00b7')
+_LIST_CONJUNCTIONS = ('and', 'or')
+
+
+def normalize_term(term):
+    """Lowercase and collapse whitespace so that aliases compare equal."""
+    return _WHITESPACE_RE.sub(' ', term.strip().lower())
+
+
+def _normalize_text(text):
+    """
+    normalize_term() for free text, also returning the offsets of the spaces
+    that replaced a line break.
+    """
+    text = text.strip().lower()
+    parts, breaks = [], set()
+    length = position = 0
+    for match in _WHITESPACE_RE.finditer(text):
+        parts.append(text[position:match.start()])
+        length += match.start() - position
+        if '\n' in match.group() or '\r' in match.group():
+            breaks.add(length)
+        parts.append(' ')
+        length += 1
+        position = match.end()
+    parts.append(text[position:])
+    return ''.join(parts), breaks
+
+
+def _list_boundary(text, breaks, index, step):
+    """Whether text[index] (looking left for step -1, right for step 1) ends a list item."""
+    if 0 <= index < len(text) and text[index] == ' ':
+        if index in breaks:
+            return True
+        index += step
+    if index < 0 or index >= len(text):
+        return True
+
+    char = text[index]
+    if char in _LIST_SEPARATORS:
+        return True
+    if step > 0 and char == '.':
+        return True
+    if step < 0 and char == '-' and (index == 0 or index - 1 in breaks):
+        # Bullet at the start of a line
+        return True
+
+    # A conjunction, as in "Python, Go and Rust"
+    if step < 0:
+        end = start = index + 1
+        while start > 0 and text[start - 1].isalpha():
+            start -= 1
+    else:
+        start = end = index
+        while end < len(text) and text[end].isalpha():
+            end += 1
+    return text[start:end] in _LIST_CONJUNCTIONS
+
+
+class SkillExtractor:
+    """
+    Local skill extraction and normalization backed by a skill taxonomy.
+
+    All canonical names and aliases of the taxonomy are compiled into an
+    Aho-Corasick automaton, so extraction is a single linear pass over the
+    text regardless of the number of terms. The same alias table is used to
+    canonicalize skills returned by the LLM parser.
+
+    Short terms ("C", "R", "ts") and terms that are also common words ("go",
+    "excel") only match in free text when they stand as a list item or on a
+    line of their own, so that "grade C", "C-level" or "ready to go" are not
+    reported as skills.
+    """
+
+    def __init__(self, taxonomy):
+        """
+        Compile a skill taxonomy.
+
+        Args:
+            taxonomy: Dict mapping a category ("technical", "soft", ...) to a
+                dict of canonical skill name -> list of aliases. The optional
+                "_ambiguous" key lists terms that are also common words.
+        """
+        self.skills = []        # skill id -> (canonical name, category)
+        self.aliases = {}       # normalized alias -> skill id
+        # Terms that need list context to match in free text
+        self.ambiguous = {normalize_term(term) for term in taxonomy.get("_ambiguous", [])}
+        for category, skills in taxonomy.items():
+            if category.startswith('_'):
+                continue
+            for canonical, aliases in skills.items():
+                skill_id = len(self.skills)
+                self.skills.append((canonical, category))
+                for alias in [canonical] + list(aliases):
+                    self.aliases.setdefault(normalize_term(alias), skill_id)
+
+        self._build_automaton()
+        logger.info(f"Compiled skill taxonomy with {len(self.skills)} skills and {len(self.aliases)} aliases")
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a taxonomy from a JSON file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _build_automaton(self):
+        """Build the goto/fail/output tables of the Aho-Corasick automaton."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]     # state -> list of (term length, skill id, needs list context)
+
+        for alias, skill_id in self.aliases.items():
+            state = 0
+            for char in alias:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            guarded = alias in self.ambiguous or (len(alias) <= 2 and alias.isalnum())
+            self._output[state].append((len(alias), skill_id, guarded))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text):
+        """
+        Find all taxonomy terms in a text.
+
+        Matches must fall on word boundaries, and short or ambiguous terms
+        must stand as a list item; overlapping matches are resolved
+        leftmost-longest so that e.g. "Spring Boot" wins over "Spring".
+
+        Returns:
+            List of (start, end, skill id) tuples in text order; offsets refer
+            to the text after normalize_term()
+        """
+        text, breaks = _normalize_text(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term_length, skill_id, guarded in output[state]:
+                start = index - term_length + 1
+                end = index + 1
+                if (start and text[start - 1].isalnum()) or (end < length and text[end].isalnum()):
+                    continue
+                if guarded and not (_list_boundary(text, breaks, start - 1, -1)
+                                    and _list_boundary(text, breaks, end, 1)):
+                    continue
+                matches.append((start, end, skill_id))
+
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected = []
+        last_end = -1
+        for start, end, skill_id in matches:
+            if start >= last_end:
+                selected.append((start, end, skill_id))
+                last_end = end
+        return selected
+
+    def extract(self, text):
+        """
+        Extract normalized skills from free text.
+
+        Returns:
+            Dict mapping each taxonomy category to a list of canonical skill
+            names, in order of first appearance
+        """
+        result = {category: [] for _, category in self.skills}
+        seen = set()
+        for _, _, skill_id in self.find(text):
+            if skill_id not in seen:
+                seen.add(skill_id)
+                canonical, category = self.skills[skill_id]
+                result[category].append(canonical)
+        return result
+
+    def normalize(self, skill):
+        """Map a skill name or alias to its canonical name, or return it unchanged if unknown."""
+        skill_id = self.aliases.get(normalize_term(skill))
+        if skill_id is None:
+            return skill.strip()
+        return self.skills[skill_id][0]
+
+    def normalize_skills(self, skills):
+        """Canonicalize a list of skill names, dropping duplicates while keeping order."""
+        normalized = []
+        seen = set()
+        for skill in skills:
+            if not isinstance(skill, str) or not skill.strip():
+                continue
+            canonical = self.normalize(skill)
+            key = normalize_term(canonical)
+            if key not in seen:
+                seen.add(key)
+                normalized.append(canonical)
+        return normalized
+
+
+_default_extractor = None
+_default_lock = threading.Lock()
+
+
+def get_skill_extractor():
+    """
+    Return the shared extractor for the configured taxonomy.
+
+    The taxonomy is read from SKILL_TAXONOMY_PATH, falling back to the
+    bundled skill_taxonomy.json, and compiled once per process.
+    """
+    global _default_extractor
+    if _default_extractor is None:
+        with _default_lock:
+            if _default_extractor is None:
+                path = os.getenv('SKILL_TAXONOMY_PATH', DEFAULT_TAXONOMY_PATH)
+                _default_extractor = SkillExtractor.from_file(path)
+    return _default_extractor
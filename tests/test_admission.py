@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, AdmissionRejected
+
+
+def test_interactive_slots_are_reserved_from_batch_and_background():
+    controller = AdmissionController(capacity=8)
+    for _ in range(6):
+        controller.acquire('batch')
+
+    # Background has its own share left, but the non-interactive cap is reached
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire('background', deadline=0.0)
+    assert rejected.value.status_code == 503
+
+    controller.acquire('interactive', deadline=0.0)
+    controller.acquire('interactive', deadline=0.0)
+    assert controller.stats()["active"] == 8
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController(capacity=1, queue_limits={"interactive": 0})
+    controller.acquire('interactive')
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire('interactive')
+    assert rejected.value.status_code == 429
+
+
+def test_service_time_is_tracked_per_class():
+    controller = AdmissionController(capacity=8, initial_service_time=5.0)
+    name, started = controller.acquire('batch')
+    controller.release((name, started - 300))
+
+    classes = controller.stats()["classes"]
+    assert classes["batch"]["estimated_service_time"] > 30
+    assert classes["interactive"]["estimated_service_time"] == 5.0
+
+
+def test_long_batch_requests_do_not_shed_interactive_requests():
+    controller = AdmissionController(capacity=8, initial_service_time=5.0)
+    for _ in range(20):
+        name, started = controller.acquire('batch')
+        controller.release((name, started - 300))
+    for _ in range(6):
+        controller.acquire('batch')
+    controller.acquire('interactive')
+    controller.acquire('interactive')
+
+    # All slots are busy, but the running interactive requests free one within seconds
+    waiter = threading.Thread(target=lambda: controller.acquire('interactive', deadline=10.0))
+    waiter.start()
+    time.sleep(0.05)
+    assert controller.stats()["classes"]["interactive"]["queue_depth"] == 1
+    controller.release(('interactive', time.monotonic()))
+    waiter.join(timeout=1)
+    assert not waiter.is_alive()
+    assert controller.stats()["classes"]["interactive"]["rejected_deadline"] == 0
+
+
+def test_freed_slot_goes_to_interactive_before_batch():
+    controller = AdmissionController(capacity=1)
+    ticket = controller.acquire('interactive')
+    order = []
+
+    def wait_for(priority):
+        controller.acquire(priority, deadline=5.0)
+        order.append(priority)
+
+    batch = threading.Thread(target=wait_for, args=('batch',))
+    batch.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=wait_for, args=('interactive',))
+    interactive.start()
+    time.sleep(0.05)
+
+    controller.release(ticket)
+    interactive.join(timeout=1)
+    assert order == ['interactive']
+    controller.release(('interactive', time.monotonic()))
+    batch.join(timeout=1)
+    assert order == ['interactive', 'batch']
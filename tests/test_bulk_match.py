@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+for module in ("google.generativeai", "dotenv", "PyPDF2", "docx2txt"):
+    pytest.importorskip(module)
+
+from bulk_match import BulkMatcher, load_completed_pairs, pair_key
+
+JOBS = [("J1", {"title": "Engineer"}), ("J2", {"title": "Manager"})]
+
+
+class FakeParser:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.parsed = []
+
+    def parse(self, resume_content, resume_type):
+        self.parsed.append(resume_content)
+        if resume_content in self.failing:
+            return {"candidate_info": {"name": "Parsing Error"}}
+        return {"candidate_info": {"name": resume_content}}
+
+
+class FakeMatcher:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.matched = []
+
+    def calculate_match(self, parsed_resume, job_description):
+        key = (parsed_resume["candidate_info"]["name"], job_description["title"])
+        self.matched.append(key)
+        if key in self.failing:
+            return {"score": 0.0, "details": {"skills_match": {"analysis": "Error in processing"}}}
+        return {"score": 0.7, "details": {"skills_match": {"analysis": "Strong match"}}}
+
+
+class FakeEvaluator:
+    def adapt_evaluation(self, job_description, match_result):
+        return dict(match_result, role_type="technical")
+
+
+def write_resumes(resume_dir, names):
+    resume_dir.mkdir()
+    for name in names:
+        (resume_dir / f"{name}.txt").write_text(name)
+
+
+def read_records(output_path):
+    with open(output_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_fallback_results_are_written_as_errors(tmp_path):
+    write_resumes(tmp_path / "resumes", ["alice", "bob"])
+    output_path = str(tmp_path / "results.jsonl")
+    bulk_matcher = BulkMatcher(JOBS, workers=2, resume_parser=FakeParser(failing={"bob"}),
+                               job_matcher=FakeMatcher(failing={("alice", "Manager")}),
+                               role_evaluator=FakeEvaluator())
+
+    progress = bulk_matcher.run(str(tmp_path / "resumes"), output_path, progress_interval=0)
+
+    errors = {(record["resume"], record["job_id"]) for record in read_records(output_path) if "error" in record}
+    assert errors == {("bob.txt", "J1"), ("bob.txt", "J2"), ("alice.txt", "J2")}
+    assert progress.errors == 3
+    assert load_completed_pairs(output_path) == {pair_key("alice.txt", "J1")}
+
+
+def test_rerun_only_processes_missing_and_failed_pairs(tmp_path):
+    write_resumes(tmp_path / "resumes", ["alice", "bob", "carol"])
+    output_path = tmp_path / "results.jsonl"
+    # A previous run scored alice/J1, failed on alice/J2 and was killed while writing a line
+    output_path.write_text(
+        json.dumps({"pair_key": pair_key("alice.txt", "J1"), "resume": "alice.txt", "job_id": "J1",
+                    "match_result": {"score": 0.7}}) + "\n" +
+        json.dumps({"pair_key": pair_key("alice.txt", "J2"), "resume": "alice.txt", "job_id": "J2",
+                    "error": "quota exceeded"}) + "\n" +
+        '{"pair_key": "trunc'
+    )
+    parser, matcher = FakeParser(), FakeMatcher()
+    bulk_matcher = BulkMatcher(JOBS, workers=2, resume_parser=parser, job_matcher=matcher,
+                               role_evaluator=FakeEvaluator())
+
+    progress = bulk_matcher.run(str(tmp_path / "resumes"), str(output_path), progress_interval=0)
+
+    assert sorted(matcher.matched) == [("alice", "Manager"), ("bob", "Engineer"), ("bob", "Manager"),
+                                       ("carol", "Engineer"), ("carol", "Manager")]
+    assert progress.completed == 5 and progress.errors == 0
+    assert len(load_completed_pairs(str(output_path))) == 6
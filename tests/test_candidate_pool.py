@@ -0,0 +1,80 @@
+from datetime import date
+
+from candidate_pool import CandidatePool, education_level, years_of_experience
+
+
+def resume(name, skills, experience, degree="BSc Computer Science", certifications=()):
+    return {
+        "candidate_info": {"name": name, "email": f"{name.lower()}@example.com", "phone": "+1 555 0100",
+                           "location": "Berlin, Germany"},
+        "summary": f"{name} is an engineer who builds reliable backend services and mentors other engineers.",
+        "skills": {"technical": list(skills), "soft": ["Communication", "Leadership"]},
+        "experience": [
+            {"company": f"Company {index}", "title": "Software Engineer", "start_date": start, "end_date": end,
+             "responsibilities": [f"Designed and operated service {index}.{item} used by thousands of customers"
+                                  for item in range(5)]}
+            for index, (start, end) in enumerate(experience)
+        ],
+        "education": [{"degree": degree, "institution": "Technical University", "graduation_date": "2012"}],
+        "certifications": [{"name": name, "issuer": "Vendor", "date": "2020"} for name in certifications],
+        "languages": [{"language": "English", "proficiency": "Fluent"}],
+        "projects": [{"name": "Side project", "description": "An open source tool for parsing log files."}]
+    }
+
+
+ALICE = resume("Alice", ["python", "k8s", "PostgreSQL"], [("Jan 2015", "Dec 2019"), ("2020", "2023")],
+               degree="MSc Computer Science", certifications=["AWS Certified Developer"])
+BOB = resume("Bob", ["Python", "React"], [("2021", "2023")])
+
+
+def test_dump_and_load_round_trip(tmp_path):
+    pool = CandidatePool()
+    pool.load([("alice", ALICE), ("bob", BOB)])
+    path = tmp_path / "pool.jsonl"
+    pool.dump_jsonl(str(path))
+
+    reloaded = CandidatePool()
+    assert reloaded.load_jsonl(str(path)) == 2
+    for row in range(2):
+        assert reloaded.candidate_ids[row] == pool.candidate_ids[row]
+        assert reloaded.skills(row) == pool.skills(row)
+        assert reloaded.certifications(row) == pool.certifications(row)
+        # Years are stored as float32 and dumped with two decimals
+        assert abs(reloaded.years(row) - pool.years(row)) < 0.01
+        assert reloaded.education(row) == pool.education(row)
+    assert reloaded.education(0) == "master"
+
+
+def test_filter_by_skill_aliases_and_years():
+    pool = CandidatePool()
+    pool.load([("alice", ALICE), ("bob", BOB)])
+
+    assert pool.select(skills=["Python"]) == ["alice", "bob"]
+    assert pool.select(skills=["Kubernetes", "python"]) == ["alice"]
+    assert pool.select(skills=["python"], min_years=5) == ["alice"]
+    assert pool.select(skills=["Haskell"]) == []
+    assert pool.select(min_education="master") == ["alice"]
+
+
+def test_unknown_end_date_is_not_an_ongoing_role():
+    today = date(2024, 6, 1)
+    assert years_of_experience([{"start_date": "2020", "end_date": "Unknown"}], today=today) == 0.0
+    assert years_of_experience([{"start_date": "Jan 2020", "end_date": "Present"}], today=today) == 4.5
+    # Overlapping roles are merged: Jan 2019 to Dec 2022
+    assert years_of_experience([{"start_date": "Jan 2019", "end_date": "Dec 2021"},
+                                {"start_date": "Jan 2020", "end_date": "Dec 2022"}], today=today) == 4.0
+
+
+def test_education_level_names_and_degrees():
+    assert education_level("bachelor") == 3
+    assert education_level("Ph.D. in Physics") == 5
+    assert education_level("Diploma in Arts") == 0
+
+
+def test_memory_usage_compares_with_the_dict_form():
+    pool = CandidatePool()
+    pool.load((f"candidate-{index}", ALICE if index % 2 else BOB) for index in range(500))
+
+    usage = pool.memory_usage()
+    assert usage["dict_bytes_per_candidate"] > usage["bytes_per_candidate"]
+    assert usage["reduction"] >= 10
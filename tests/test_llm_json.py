@@ -0,0 +1,137 @@
+import pytest
+from llm_json import StreamingJSONDecoder, decode_json, generate_json, sanitize_json
+
+
+def feed_in_chunks(decoder, text, size):
+    for start in range(0, len(text), size):
+        decoder.feed(text[start:start + size])
+    return decoder.finish()
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for a GenerativeModel, returning canned text in chunks."""
+
+    def __init__(self, text, chunk_size=5, fail_after=None):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.fail_after = fail_after
+
+    def generate_content(self, prompt, stream=False):
+        if not stream:
+            return FakeChunk(self.text)
+        return self._stream()
+
+    def _stream(self):
+        for index, start in enumerate(range(0, len(self.text), self.chunk_size)):
+            if self.fail_after is not None and index >= self.fail_after:
+                raise RuntimeError("stream reset")
+            yield FakeChunk(self.text[start:start + self.chunk_size])
+
+
+def test_decodes_plain_object():
+    assert decode_json('{"a": 1, "b": [1, 2], "c": {"d": "x"}}') == {"a": 1, "b": [1, 2], "c": {"d": "x"}}
+
+
+def test_skips_fence_and_prose():
+    text = 'Here is the result:\n```json\n{"role_type": "Legal", "confidence": 0.9}\n```\nDone.'
+    assert decode_json(text) == {"role_type": "Legal", "confidence": 0.9}
+
+
+def test_sanitize_drops_comments_and_trailing_commas():
+    text = '{"a": 1,  # comment, with a comma\n "b": [1, 2,], // another\n "c": "# not a comment",}'
+    assert decode_json(sanitize_json(text)) == {"a": 1, "b": [1, 2], "c": "# not a comment"}
+
+
+def test_comments_do_not_split_members():
+    fields = []
+    decoder = StreamingJSONDecoder(lambda key, value: fields.append(key))
+    text = ('{\n    "score": 85,  # Overall, out of 100\n'
+            '    "interpretation": "Good",  // Based on score, range\n'
+            '    "details": {"a": 1}\n}')
+    result = feed_in_chunks(decoder, text, 7)
+    assert result == {"score": 85, "interpretation": "Good", "details": {"a": 1}}
+    assert fields == ["score", "interpretation", "details"]
+    assert not decoder.repaired
+
+
+def test_double_slash_split_across_chunks():
+    decoder = StreamingJSONDecoder()
+    decoder.feed('{"a": 1, /')
+    decoder.feed('/ note, here\n "b": 2}')
+    assert decoder.finish() == {"a": 1, "b": 2}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1000])
+def test_fields_are_reported_in_order_as_they_complete(chunk_size):
+    fields = []
+    decoder = StreamingJSONDecoder(lambda key, value: fields.append((key, value)))
+    text = '{"score": 85, "details": {"x": [1, {"y": "},"}]}, "red_flags": ["gap, 2022"]}'
+    feed_in_chunks(decoder, text, chunk_size)
+    assert fields == [("score", 85), ("details", {"x": [1, {"y": "},"}]}), ("red_flags", ["gap, 2022"])]
+
+
+def test_field_reported_before_rest_of_output_arrives():
+    fields = []
+    decoder = StreamingJSONDecoder(lambda key, value: fields.append(key))
+    decoder.feed('{"score": 85, "details": {"skills')
+    assert fields == ["score"]
+
+
+def test_failing_callback_does_not_abort_decoding():
+    def on_field(key, value):
+        raise RuntimeError("callback failed")
+
+    decoder = StreamingJSONDecoder(on_field)
+    assert feed_in_chunks(decoder, '{"a": 1, "b": 2}', 4) == {"a": 1, "b": 2}
+
+
+def test_repairs_truncated_nested_object():
+    decoder = StreamingJSONDecoder()
+    decoder.feed('{"score": 85, "interpretation": "Good", "details": {"skills_match": {"raw_score": 8, "analysis": "Str')
+    result = decoder.finish()
+    assert result == {"score": 85, "interpretation": "Good",
+                      "details": {"skills_match": {"raw_score": 8, "analysis": "Str"}}}
+    assert decoder.repaired
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1, "b": ', {"a": 1, "b": None}),
+    ('{"a": 1,', {"a": 1}),
+    ('{"a": "x\\', {"a": "x"}),
+    ('{"a": [1, 2', {"a": [1, 2]}),
+    ('{"a": 1,  # Overall, out of 100', {"a": 1}),
+])
+def test_repairs_truncation_points(text, expected):
+    decoder = StreamingJSONDecoder()
+    decoder.feed(text)
+    assert decoder.finish() == expected
+    assert decoder.repaired
+
+
+def test_raises_without_object():
+    with pytest.raises(ValueError):
+        decode_json("I cannot help with that.")
+
+
+def test_generate_json_streaming_and_blocking():
+    text = '```json\n{"role_type": "Legal", "confidence": 0.9}\n```'
+    assert generate_json(FakeModel(text), "prompt", stream=True) == {"role_type": "Legal", "confidence": 0.9}
+    assert generate_json(FakeModel(text), "prompt", stream=False) == {"role_type": "Legal", "confidence": 0.9}
+
+
+def test_generate_json_salvages_failed_stream():
+    decoder = StreamingJSONDecoder()
+    model = FakeModel('{"score": 85, "interpretation": "Good", "details": {}}', chunk_size=10, fail_after=3)
+    result = generate_json(model, "prompt", stream=True, decoder=decoder)
+    assert result["score"] == 85
+    assert decoder.repaired
+
+
+def test_generate_json_raises_when_stream_fails_immediately():
+    with pytest.raises(RuntimeError):
+        generate_json(FakeModel('{"a": 1}', fail_after=0), "prompt", stream=True)
@@ -0,0 +1,145 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from admission import AdmissionController
+from job_matcher import CRITERIA_WEIGHTS
+from rescoring import JobRescorer, RescoreJobs, RescoreQueueFull, affected_criteria, has_all_criteria
+
+OLD_JOB = {"title": "Software Engineer", "requirements": ["Python"]}
+NEW_JOB = {"title": "Software Engineer", "requirements": ["Python", "Bachelor degree in Physics"]}
+
+
+class FakeMatcher:
+    skill_extractor = None
+
+    def __init__(self, raw_score=80, delay=0.0):
+        self.raw_score = raw_score
+        self.delay = delay
+        self.full_matches = 0
+
+    def score_criteria(self, parsed_resume, job_description, criteria):
+        time.sleep(self.delay)
+        if parsed_resume.get("fail"):
+            raise RuntimeError("quota exceeded")
+        return {criterion: {"raw_score": self.raw_score, "analysis": "re-scored"} for criterion in criteria}
+
+    def calculate_match(self, parsed_resume, job_description):
+        self.full_matches += 1
+        return {"score": 0.9, "details": {criterion: {"raw_score": 90} for criterion in CRITERIA_WEIGHTS}}
+
+
+class FakeEvaluator:
+    def adapt_evaluation(self, job_description, match_result):
+        return dict(match_result, role_type="technical")
+
+
+def stored_result(education_score=20):
+    details = {criterion: {"raw_score": 50} for criterion in CRITERIA_WEIGHTS}
+    details["education"] = {"raw_score": education_score}
+    return {"score": 0.5, "details": details}
+
+
+def candidate(candidate_id, match_result=None, **resume):
+    return {"candidate_id": candidate_id, "parsed_resume": resume, "match_result": match_result or stored_result()}
+
+
+def test_degree_edit_only_affects_education():
+    criteria, changes = affected_criteria(OLD_JOB, NEW_JOB)
+    assert criteria == {"education"}
+    assert len(changes) == 1
+
+
+def test_failed_candidate_keeps_previous_result():
+    result = JobRescorer(FakeMatcher(), None, workers=2).rescore(
+        OLD_JOB, NEW_JOB, [candidate("C1"), candidate("C2", fail=True)])
+
+    first, second = result["results"]
+    assert first["match_result"]["details"]["education"]["raw_score"] == 80
+    assert "error" not in first
+    assert second["match_result"]["details"]["education"]["raw_score"] == 20
+    assert second["error"]
+
+
+def test_unparseable_raw_score_does_not_fail_the_batch():
+    result = JobRescorer(FakeMatcher(raw_score="8/10"), None).rescore(OLD_JOB, NEW_JOB, [candidate("C1")])
+    assert result["results"][0]["match_result"]["score"] == 0.5
+    assert result["results"][0]["error"]
+
+
+def test_projected_result_gets_a_full_rescore():
+    projected = {"score": 0.8, "interpretation": "Good Fit"}
+    assert not has_all_criteria(projected)
+    assert has_all_criteria(stored_result())
+
+    matcher = FakeMatcher()
+    result = JobRescorer(matcher, FakeEvaluator()).rescore(
+        OLD_JOB, NEW_JOB, [candidate("C1", match_result=projected), candidate("C2")])
+
+    first, second = result["results"]
+    assert first["match_result"]["score"] == 0.9
+    assert first["match_result"]["role_type"] == "technical"
+    assert second["match_result"]["details"]["education"]["raw_score"] == 80
+    assert matcher.full_matches == 1
+
+
+def test_candidates_run_under_admission_control():
+    controller = AdmissionController(capacity=4)
+    JobRescorer(FakeMatcher(delay=0.02), None, workers=8, admission=controller).rescore(
+        OLD_JOB, NEW_JOB, [candidate(f"C{i}") for i in range(12)], priority="background")
+
+    stats = controller.stats()
+    assert stats["classes"]["background"]["admitted"] == 12
+    # Background requests may only use a quarter of the slots
+    assert stats["classes"]["background"]["max_queue_depth"] > 0
+    assert stats["active"] == 0
+
+
+def test_progress_callback_counts_every_candidate():
+    progress = []
+    JobRescorer(FakeMatcher(), None, workers=4).rescore(
+        OLD_JOB, NEW_JOB, [candidate(f"C{i}") for i in range(5)],
+        on_progress=lambda completed, total: progress.append((completed, total)))
+    assert progress == [(i, 5) for i in range(1, 6)]
+
+
+def test_job_runs_in_background_and_can_be_polled(tmp_path):
+    jobs = RescoreJobs(JobRescorer(FakeMatcher(), None), directory=str(tmp_path))
+    job = jobs.submit(OLD_JOB, NEW_JOB, [candidate("C1")])
+    assert job["status"] == "queued"
+
+    for _ in range(100):
+        state = jobs.get(job["job_id"])
+        if state["status"] == "done":
+            break
+        time.sleep(0.05)
+    assert state["completed"] == 1
+    assert state["result"]["affected_criteria"] == ["education"]
+
+
+def test_backlog_of_jobs_is_bounded(tmp_path):
+    release = threading.Event()
+
+    class BlockingRescorer:
+        def rescore(self, *args, **kwargs):
+            release.wait(5)
+            return {"results": []}
+
+    jobs = RescoreJobs(BlockingRescorer(), directory=str(tmp_path), max_running=1, max_pending=2)
+    jobs.submit(OLD_JOB, NEW_JOB, [])
+    jobs.submit(OLD_JOB, NEW_JOB, [])
+    with pytest.raises(RescoreQueueFull):
+        jobs.submit(OLD_JOB, NEW_JOB, [])
+
+    release.set()
+    jobs._executor.shutdown(wait=True)
+    assert jobs._pending == 0
+
+
+def test_unknown_or_malformed_job_id(tmp_path):
+    jobs = RescoreJobs(JobRescorer(FakeMatcher(), None), directory=str(tmp_path))
+    assert jobs.get("0" * 32) is None
+    assert jobs.get("../etc/passwd") is None
@@ -0,0 +1,37 @@
+import gzip
+import json
+
+from response_formatter import ResponseFormatter, accepts_gzip, project
+
+
+def test_accepts_gzip():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, *;q=0.5")
+    assert not accepts_gzip(None)
+    assert not accepts_gzip("deflate, br")
+    assert not accepts_gzip("gzip;q=0")
+
+
+def test_explicit_gzip_overrides_wildcard():
+    assert not accepts_gzip("*;q=0.5, gzip;q=0")
+    assert not accepts_gzip("gzip;q=0, *")
+    assert accepts_gzip("*;q=0, gzip;q=0.8")
+
+
+def test_project_keeps_requested_paths():
+    data = {"score": 0.8, "details": {"skills_match": {"matching_skills": ["Python"], "analysis": "..."}}}
+    assert project(data, ["score", "details.skills_match.matching_skills"]) == {
+        "score": 0.8, "details": {"skills_match": {"matching_skills": ["Python"]}}}
+
+
+def test_encode_compresses_large_bodies_only():
+    formatter = ResponseFormatter()
+    payload = {"items": ["x" * 100] * 20}
+
+    body, headers = formatter.encode(payload, "match", "gzip")
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == payload
+
+    body, headers = formatter.encode({"score": 1}, "match", "gzip")
+    assert "Content-Encoding" not in headers
+    assert formatter.stats()["endpoints"]["match"]["responses"] == 2
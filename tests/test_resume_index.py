@@ -0,0 +1,75 @@
+import pickle
+
+from resume_index import NearDuplicateIndex
+
+ALICE = "Alice Smith senior backend engineer with ten years of Python and Go experience at Acme"
+BOB = "Bob Jones registered nurse with intensive care unit experience and a BSc in nursing"
+
+
+def open_index(path):
+    return NearDuplicateIndex(threshold=0.8, snapshot_path=str(path), compact_every=0)
+
+
+def test_lookup_finds_near_duplicate():
+    index = NearDuplicateIndex(threshold=0.8)
+    entry_id = index.add(ALICE, {"name": "Alice"})
+
+    match = index.lookup(ALICE + ".")
+    assert match.entry_id == entry_id
+    assert match.payload == {"name": "Alice"}
+    assert index.lookup(BOB) is None
+
+
+def test_processes_sharing_a_snapshot_keep_each_others_entries(tmp_path):
+    path = tmp_path / "index.pkl"
+    first, second = open_index(path), open_index(path)
+    alice = first.add(ALICE, {"name": "Alice"})
+    bob = second.add(BOB, {"name": "Bob"})
+    second.update_payload(bob, "match", {"score": 0.7})
+    first.flush()
+    second.flush()
+
+    assert first.compact()
+    # The second process has not read the replaced journal, so it must not overwrite the snapshot
+    assert not second.compact()
+
+    reopened = open_index(path)
+    assert len(reopened) == 2
+    assert reopened.get_payload(alice) == {"name": "Alice"}
+    assert reopened.get_payload(bob) == {"name": "Bob", "match": {"score": 0.7}}
+
+
+def test_truncated_journal_record_is_ignored(tmp_path):
+    path = tmp_path / "index.pkl"
+    index = open_index(path)
+    alice = index.add(ALICE, {"name": "Alice"})
+    index.flush()
+
+    record = pickle.dumps((0, "add", 1, index.signature(BOB), {"name": "Bob"}))
+    with open(index.journal_path, "ab") as journal:
+        journal.write(record[:len(record) // 2])
+
+    reopened = open_index(path)
+    assert len(reopened) == 1
+    assert reopened.get_payload(alice) == {"name": "Alice"}
+
+    # Records appended after the corrupt tail must stay readable
+    bob = reopened.add(BOB, {"name": "Bob"})
+    reopened.flush()
+    assert open_index(path).get_payload(bob) == {"name": "Bob"}
+
+
+def test_running_process_does_not_append_after_a_corrupt_tail(tmp_path):
+    path = tmp_path / "index.pkl"
+    index = open_index(path)
+    index.add(ALICE, {"name": "Alice"})
+    index.flush()
+
+    # Another worker died while appending
+    record = pickle.dumps((0, "add", 1, index.signature(ALICE), {"name": "Dead"}))
+    with open(index.journal_path, "ab") as journal:
+        journal.write(record[:len(record) // 2])
+
+    bob = index.add(BOB, {"name": "Bob"})
+    index.flush()
+    assert open_index(path).get_payload(bob) == {"name": "Bob"}
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+for module in ("google.generativeai", "dotenv", "PyPDF2", "docx2txt"):
+    pytest.importorskip(module)
+
+from resume_parser import ResumeParser
+
+
+class FakeChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for the Gemini model, answering every prompt with the output of respond(prompt)."""
+
+    def __init__(self, respond):
+        self.respond = respond
+
+    def generate_content(self, prompt, stream=False):
+        text = self.respond(prompt)
+        if not stream:
+            return FakeChunk(text)
+        return [FakeChunk(text[i:i + 50]) for i in range(0, len(text), 50)]
+
+
+def make_parser(respond):
+    parser = ResumeParser()
+    parser.model = FakeModel(respond)
+    return parser
+
+
+PARSED = {
+    "candidate_info": {"name": "Jane Doe", "email": "jane@example.com"},
+    "skills": {"technical": ["python"], "soft": []},
+    "experience": [{"company": "Acme", "title": "Engineer", "responsibilities": ["Built APIs"]}],
+    "education": [], "certifications": [], "languages": [], "projects": []
+}
+
+
+def test_complete_parse_is_not_marked():
+    parsed = make_parser(lambda prompt: json.dumps(PARSED)).parse_text("Jane Doe\nPython engineer")
+    assert parsed["candidate_info"]["name"] == "Jane Doe"
+    assert parsed["skills"]["technical"] == ["Python"]
+    assert "repaired" not in parsed
+
+
+def test_truncated_parse_is_marked_repaired():
+    truncated = json.dumps(PARSED)[:120]
+    parsed = make_parser(lambda prompt: truncated).parse_text("Jane Doe\nPython engineer")
+    assert parsed["candidate_info"]["name"] == "Jane Doe"
+    assert parsed["projects"] == []
+    assert parsed["repaired"] is True
+
+
+def long_resume(heading):
+    roles = "\n\n".join(
+        f"Company {index}\nSenior Engineer, {2000 + index} - {2001 + index}\n"
+        + "\n".join(f"- Delivered project {index}.{item} for a large customer on time" for item in range(10))
+        for index in range(30))
+    return f"Jane Doe\njane@example.com\n\n{heading}\n{roles}\n\nEDUCATION\nBSc Computer Science, 1999"
+
+
+def respond_by_section(failing=()):
+    def respond(prompt):
+        if "section of a longer resume" not in prompt:
+            return json.dumps(dict(PARSED, experience=[{"company": "Acme", "title": "Full parse"}]))
+        for section in failing:
+            if f'"{section}" section' in prompt:
+                raise RuntimeError("quota exceeded")
+        if '"experience" section' in prompt:
+            return json.dumps({"experience": [{"company": "Company 1", "title": "Senior Engineer"}]})
+        if '"education" section' in prompt:
+            return json.dumps({"education": [{"degree": "BSc"}]})
+        return json.dumps({"candidate_info": {"name": "Jane Doe", "email": "jane@example.com"}})
+    return respond
+
+
+def test_unknown_heading_falls_back_to_a_full_parse(monkeypatch):
+    monkeypatch.setattr("resume_parser.CHUNKED_PARSE_THRESHOLD", 5000)
+    monkeypatch.setattr("resume_parser.CHUNK_MAX_CHARS", 3000)
+    parser = make_parser(respond_by_section())
+    text = long_resume("WHERE I HAVE WORKED")
+
+    assert parser.parse_chunked(text) is None
+    assert parser.parse_text(text)["experience"] == [{"company": "Acme", "title": "Full parse"}]
+
+
+def test_sectioned_resume_is_parsed_in_chunks(monkeypatch):
+    monkeypatch.setattr("resume_parser.CHUNKED_PARSE_THRESHOLD", 5000)
+    monkeypatch.setattr("resume_parser.CHUNK_MAX_CHARS", 3000)
+    parsed = make_parser(respond_by_section()).parse_text(long_resume("PROFESSIONAL BACKGROUND"))
+
+    assert parsed["experience"] == [{"company": "Company 1", "title": "Senior Engineer"}]
+    assert parsed["education"] == [{"degree": "BSc"}]
+    assert "repaired" not in parsed
+
+
+def test_failed_chunk_marks_the_parse(monkeypatch):
+    monkeypatch.setattr("resume_parser.CHUNKED_PARSE_THRESHOLD", 5000)
+    monkeypatch.setattr("resume_parser.CHUNK_MAX_CHARS", 3000)
+    parsed = make_parser(respond_by_section(failing=("education",))).parse_text(long_resume("EXPERIENCE"))
+
+    assert parsed["experience"]
+    assert parsed["education"] == []
+    assert parsed["repaired"] is True
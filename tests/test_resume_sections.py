@@ -0,0 +1,35 @@
+from resume_sections import heading_section, split_long_section, split_sections
+
+
+def test_heading_section():
+    assert heading_section("WORK EXPERIENCE:") == "experience"
+    assert heading_section("Skills & Tools") == "skills"
+    assert heading_section("PROFESSIONAL BACKGROUND") == "experience"
+    assert heading_section("Led the experience redesign of the checkout flow") is None
+
+
+def test_split_sections_keeps_contact_and_order():
+    text = "Jane Doe\njane@example.com\n\nExperience\nAcme Corp\n\nEducation\nBSc Physics\n\nExperience\nOlder role"
+    assert [name for name, _ in split_sections(text)] == ["contact", "experience", "education", "experience"]
+
+
+def test_short_section_is_not_split():
+    assert split_long_section("Experience\nAcme Corp", 100) == ["Experience\nAcme Corp"]
+
+
+def test_splits_between_entries_first():
+    roles = ["Acme Corp\nEngineer\n- " + "x" * 50, "Globex\nManager\n- " + "y" * 50]
+    assert split_long_section("\n\n".join(roles), 80) == roles
+
+
+def test_long_entry_repeats_its_header_in_continuation_chunks():
+    header = "Acme Corp\nSenior Engineer, Jan 2015 - Present"
+    bullets = [f"- Delivered project number {i} end to end" for i in range(30)]
+    chunks = split_long_section("EXPERIENCE\n" + header + "\n" + "\n".join(bullets), 400)
+
+    assert len(chunks) > 1
+    assert chunks[0].startswith("EXPERIENCE\n" + header)
+    for chunk in chunks[1:]:
+        assert chunk.startswith(header + "\n- ")
+    continued = [line for chunk in chunks for line in chunk.splitlines() if line.startswith("- ")]
+    assert continued == bullets
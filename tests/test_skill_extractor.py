@@ -0,0 +1,41 @@
+import pytest
+
+from skill_extractor import SkillExtractor, get_skill_extractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return get_skill_extractor()
+
+
+def skills(extractor, text):
+    return [extractor.skills[skill_id][0] for _, _, skill_id in extractor.find(text)]
+
+
+@pytest.mark.parametrize("text", [
+    "Holds an active TS/SCI clearance",
+    "Presented roadmaps to C-level executives",
+    "Finished the course with grade C",
+    "Ready to go from day one",
+])
+def test_words_that_look_like_skills_are_not_matched(extractor, text):
+    assert skills(extractor, text) == []
+
+
+def test_short_and_ambiguous_terms_match_in_a_skills_list(extractor):
+    assert skills(extractor, "Skills: C, C++, Python and Go") == ["C", "C++", "Python", "Golang"]
+
+
+def test_leftmost_longest_match():
+    extractor = SkillExtractor({"technical": {"Spring": [], "Spring Boot": ["springboot"]}})
+    assert skills(extractor, "Built services with Spring Boot and Spring") == ["Spring Boot", "Spring"]
+
+
+def test_git_hosting_services_are_not_aliases_of_git(extractor):
+    assert extractor.normalize_skills(["GitHub", "Git", "git"]) == ["GitHub", "Git"]
+
+
+def test_extract_groups_skills_by_category(extractor):
+    result = extractor.extract("Python developer, strong communication skills")
+    assert result["technical"] == ["Python"]
+    assert "Communication" in result["soft"]